@@ -0,0 +1,140 @@
+import gzip
+import io
+import os
+from pathlib import Path
+import shutil
+import tarfile
+import time
+from typing import BinaryIO, Dict, Optional, Set
+import zipfile
+
+# the earliest timestamp a zip file can store, used when SOURCE_DATE_EPOCH is unset
+DEFAULT_MTIME = 315532800
+FILE_MODE = 0o644
+TAR_SUFFIXES: Dict[str, str] = {
+    ".tar": "w",
+    ".tar.bz2": "w:bz2",
+    ".tar.xz": "w:xz",
+}
+# gzipped tars are compressed by hand, see `ArchiveWriter`
+GZIP_SUFFIXES = {".tar.gz", ".tgz"}
+
+
+def archive_format(filename: Path) -> str:
+    """The archive suffix of `filename`, e.g. `.tar.gz`, or raise `ValueError` if
+    it isn't a supported archive."""
+    name = filename.name.lower()
+    suffixes = [".zip", *GZIP_SUFFIXES, *TAR_SUFFIXES]
+    for suffix in sorted(suffixes, key=len, reverse=True):
+        if name.endswith(suffix):
+            return suffix
+    raise ValueError(
+        f"{filename} is not a .zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz file"
+    )
+
+
+def source_date_epoch() -> int:
+    return int(os.environ.get("SOURCE_DATE_EPOCH", DEFAULT_MTIME))
+
+
+class ArchiveWriter:
+    def __init__(self, filename: Path, mtime: Optional[int] = None):
+        """Streams build outputs into a tar or zip archive as they're produced.
+        Entries are written in the order they're added, with a fixed timestamp,
+        mode and owner, so the same inputs added in the same order give a
+        byte-for-byte identical archive. The archive is written to a temporary
+        file and only moved into place once it's closed without error.
+
+        Args:
+            filename (`Path`): The archive to write. Its suffix picks the format.
+            mtime (`int`, optional): The timestamp of every entry. Defaults to
+                `SOURCE_DATE_EPOCH` if set, otherwise 1980-01-01.
+
+        """
+        self.filename = filename
+        self.format = archive_format(filename)
+        self.mtime = mtime if mtime is not None else source_date_epoch()
+        self.names: Set[str] = set()
+        self._tmp_filename = filename.with_name(f".{filename.name}.{os.getpid()}.tmp")
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        self._raw: BinaryIO = open(self._tmp_filename, "wb")
+        self._gzip: Optional[gzip.GzipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        if self.format == ".zip":
+            self._zip = zipfile.ZipFile(self._raw, "w", zipfile.ZIP_DEFLATED)
+        elif self.format in GZIP_SUFFIXES:
+            # tarfile's own gzip support stamps the header with the current time
+            self._gzip = gzip.GzipFile(
+                filename="", mode="wb", fileobj=self._raw, mtime=self.mtime
+            )
+            self._tar = tarfile.open(
+                fileobj=self._gzip, mode="w", format=tarfile.GNU_FORMAT
+            )
+        else:
+            # typeshed only accepts literal modes
+            self._tar = tarfile.open(  # type: ignore[call-overload]
+                fileobj=self._raw,
+                mode=TAR_SUFFIXES[self.format],
+                format=tarfile.GNU_FORMAT,
+            )
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(discard=exc_type is not None)
+
+    def _claim(self, name: str):
+        if name in self.names:
+            raise ValueError(f"{name} was already added to {self.filename}")
+        self.names.add(name)
+
+    def _tar_info(self, name: str, size: int) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = self.mtime
+        info.mode = FILE_MODE
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    def _zip_info(self, name: str, size: int) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=time.gmtime(self.mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = FILE_MODE << 16
+        info.file_size = size
+        return info
+
+    def add_bytes(self, name: str, data: bytes):
+        """Add an entry at `name`, a path relative to the archive root."""
+        self._claim(name)
+        if self._zip is not None:
+            self._zip.writestr(self._zip_info(name, len(data)), data)
+        else:
+            assert self._tar is not None
+            self._tar.addfile(self._tar_info(name, len(data)), io.BytesIO(data))
+
+    def add_file(self, name: str, filename: Path):
+        """Stream the contents of `filename` into an entry at `name`."""
+        self._claim(name)
+        size = filename.stat().st_size
+        with open(filename, "rb") as f:
+            if self._zip is not None:
+                info = self._zip_info(name, size)
+                with self._zip.open(
+                    info, "w", force_zip64=size > zipfile.ZIP64_LIMIT
+                ) as entry:
+                    shutil.copyfileobj(f, entry)
+            else:
+                assert self._tar is not None
+                self._tar.addfile(self._tar_info(name, size), f)
+
+    def close(self, discard: bool = False):
+        for closable in [self._zip, self._tar, self._gzip, self._raw]:
+            if closable is not None:
+                closable.close()
+        if discard:
+            os.remove(str(self._tmp_filename))
+        else:
+            os.replace(str(self._tmp_filename), str(self.filename))
@@ -0,0 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+import glob
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Iterator, List, Optional
+
+from .highlight import HighlightCache
+from .resources import BuildResources
+from .site import Site
+from .utils import tictoc
+
+# shared by every site built in this process
+_resources: Optional[BuildResources] = None
+
+
+def expand_settings_files(patterns: List[str]) -> List[Path]:
+    """Expand a mix of paths and glob patterns, dropping duplicates but keeping the
+    order they were given in."""
+    settings_files: List[Path] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for match in matches:
+            settings_file = Path(match).resolve()
+            if settings_file not in settings_files:
+                settings_files.append(settings_file)
+    return settings_files
+
+
+@contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    previous = os.getcwd()
+    os.chdir(str(path))
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def build_site(
+    settings_file: Path,
+    cache_dir: Optional[Path] = None,
+    relative_to_settings: bool = False,
+    clean: bool = False,
+) -> dict:
+    """Build one site with this process's shared resources. Module level so it can
+    run in a process pool.
+
+    Returns:
+        dict: The settings file, build time in seconds, page count and, if the build
+            failed, the error.
+
+    """
+    global _resources
+    if _resources is None:
+        highlight_file = cache_dir / "highlight.json" if cache_dir is not None else None
+        _resources = BuildResources(HighlightCache(highlight_file))
+
+    tic = time.perf_counter()
+    result = {"settings_file": str(settings_file), "pages": 0, "error": None}
+    directory = settings_file.parent if relative_to_settings else Path.cwd()
+    try:
+        with _working_directory(directory):
+            site = Site.from_settings_file(settings_file, resources=_resources)
+            if clean:
+                site.clean()
+            site.build()
+            result["pages"] = len(site.pages)
+    except Exception as e:
+        logging.exception(f"failed to build {settings_file}")
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = tictoc(tic, time.perf_counter())
+    return result
+
+
+def build_many(
+    settings_files: List[Path],
+    workers: int = 1,
+    cache_dir: Optional[Path] = None,
+    relative_to_settings: bool = False,
+    clean: bool = False,
+) -> List[dict]:
+    """Build several sites, in this process if `workers` is 1 or across a process
+    pool otherwise. Each site is isolated, but sites built by the same process share
+    Markdown renderers, highlighted code and compiled templates."""
+    build = partial(
+        build_site,
+        cache_dir=cache_dir,
+        relative_to_settings=relative_to_settings,
+        clean=clean,
+    )
+    if workers == 1:
+        return [build(settings_file) for settings_file in settings_files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(build, settings_file) for settings_file in settings_files
+        ]
+        return [future.result() for future in futures]
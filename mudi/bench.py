@@ -0,0 +1,132 @@
+import http.client
+import itertools
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Dict, List, Type
+from urllib.parse import quote
+
+from .server import DirectoryRequestHandler, DirectoryServer
+from .site import Site
+
+
+class QuietRequestHandler(DirectoryRequestHandler):
+    def log_message(self, format, *args):
+        # per-request access logs would dominate the measurement
+        pass
+
+
+def site_urls(site: Site) -> List[str]:
+    """The URL path of every page and copied file the site outputs."""
+    urls = [
+        "/"
+        + quote(site.page_output_filename(page).relative_to(site.output_dir).as_posix())
+        for page in site.pages.values()
+    ]
+    urls += [
+        "/" + quote(site.copied_output_name(filename).as_posix())
+        for filename in site.files_to_copy
+    ]
+    return sorted(urls)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank percentile
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def run_load(
+    host: str, port: int, urls: List[str], concurrency: int, requests: int
+) -> dict:
+    """Issue `requests` GETs cycling through `urls` from `concurrency` threads, and
+    summarize throughput, latency and errors."""
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    def worker():
+        nonlocal errors
+        while True:
+            index = next(counter)
+            if index >= requests:
+                return
+            url = urls[index % len(urls)]
+            tic = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                connection.request("GET", url)
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException):
+                status = "error"
+            toc = time.perf_counter()
+            with lock:
+                latencies.append(toc - tic)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == "error" or status[0] in "45":
+                    errors += 1
+
+    tic = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - tic
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            f"p{percent}": round(1000 * _percentile(latencies, percent), 3)
+            for percent in [50, 95, 99]
+        },
+    }
+
+
+def bench_serve(
+    serve_dir: Path,
+    urls: List[str],
+    concurrency: int = 8,
+    requests: int = 1000,
+    ServerClass: Type[DirectoryServer] = DirectoryServer,
+) -> dict:
+    """Serve `serve_dir` on an ephemeral local port and load test it.
+
+    The cold run requests every URL once, in order, before anything has been served.
+    The warm run then issues `requests` requests cycling through the URLs.
+
+    """
+    if not urls:
+        raise ValueError("no URLs to request")
+    with ServerClass(str(serve_dir), ("127.0.0.1", 0), QuietRequestHandler) as httpd:
+        host, port = httpd.socket.getsockname()[:2]
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        logging.info(
+            f"benchmarking {ServerClass.__name__} on {host}:{port} with {len(urls)} urls"
+        )
+        try:
+            cold = run_load(host, port, urls, concurrency, len(urls))
+            warm = run_load(host, port, urls, concurrency, requests)
+        finally:
+            httpd.shutdown()
+    return {
+        "server": ServerClass.__name__,
+        "urls": len(urls),
+        "concurrency": concurrency,
+        "cold": cold,
+        "warm": warm,
+    }
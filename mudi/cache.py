@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, Iterator, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+@contextmanager
+def _locked(filename: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `filename` across processes, where supported."""
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with open(str(filename) + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class FileCache:
+    def __init__(self, filename: Optional[Path] = None):
+        """A string-keyed cache held in memory and optionally persisted between builds
+        as a JSON file. Saving merges this cache's changes into the file under a lock,
+        so several processes can share one cache file without losing entries.
+
+        Args:
+            filename (`Path`, optional): Where the cache is loaded from and saved to. If
+                `None`, the cache only lives for the lifetime of the process.
+
+        Attributes:
+            hits (`int`): The number of lookups which found a cached value.
+            misses (`int`): The number of lookups which did not.
+
+        """
+        self.filename = filename
+        self._data: Dict[str, Any] = {}
+        # changes since the last load or save, merged into the file when saving
+        self._changed: Dict[str, Any] = {}
+        self._discarded: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if self.filename is not None:
+            self.load()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash an arbitrary tuple of values into a stable cache key."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _read(self) -> Dict[str, Any]:
+        if self.filename is None or not self.filename.is_file():
+            return {}
+        try:
+            with open(self.filename, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logging.warning(f"ignoring unreadable cache file {self.filename}")
+            return {}
+
+    def load(self):
+        self._data = self._read()
+        logging.debug(f"loaded {len(self._data)} cache entries from {self.filename}")
+
+    def save(self):
+        if self.filename is None or not (self._changed or self._discarded):
+            return
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filename = self.filename.with_name(
+            f"{self.filename.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with _locked(self.filename):
+            # pick up entries other processes saved since this cache was loaded
+            data = self._read()
+            data.update(self._changed)
+            for key in self._discarded:
+                data.pop(key, None)
+            with open(tmp_filename, "w") as f:
+                json.dump(data, f)
+            os.replace(str(tmp_filename), str(self.filename))
+        self._data = data
+        self._changed = {}
+        self._discarded = set()
+        logging.debug(f"saved {len(self._data)} cache entries to {self.filename}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = value
+        self._changed[key] = value
+        self._discarded.discard(key)
+
+    def discard(self, key: str):
+        if self._data.pop(key, None) is not None:
+            self._changed.pop(key, None)
+            self._discarded.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses "
+            f"({round(100 * self.hit_rate, 1)}% hit rate)"
+        )
@@ -1,16 +1,34 @@
 import click
+import json
 import logging
 from pathlib import Path
 import shutil
-from typing import Any, Callable, Dict, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 import watchgod
 
 from . import __version__
+from .archive import archive_format
+from .batch import build_many, expand_settings_files
+from .bench import bench_serve, site_urls
 from .dispatcher import MudiDispatcher
-from .logger import setup_logger
+from .exceptions import ShardMergeError
+from .logger import log_to_stderr, setup_logger
+from .metrics import Metrics, serve_metrics
 from .mudi_settings import MudiSettings
+from .reload import ReloadBroker
+from .selection import PageSelector
+from .server import (
+    DirectoryServer,
+    LiveReloadRequestHandler,
+    LiveReloadServer,
+    ThreadingDirectoryServer,
+)
 from .server import serve as serve_directory
+from .shard import Shard, merge_shards
 from .site import Site
+from .utils import tictoc
 
 
 def populate_context(
@@ -50,6 +68,32 @@ def output_dir(help_text: str = "Where mudi saves its output."):
     return output_dir_decorator
 
 
+def metrics_port(function):
+    function = click.option(
+        "--metrics-port",
+        type=int,
+        help="Expose Prometheus metrics at http://localhost:PORT/metrics.",
+    )(function)
+    return function
+
+
+def start_metrics(port: Optional[int]) -> Optional[Metrics]:
+    if port is None:
+        return None
+    metrics = Metrics()
+    serve_metrics(metrics, port)
+    return metrics
+
+
+def parse_shard(ctx, param, value: Optional[str]) -> Optional[Shard]:
+    if value is None:
+        return None
+    try:
+        return Shard.from_string(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
 # CLI definition
 @click.group()
 @click.pass_context
@@ -82,18 +126,229 @@ def clean(ctx, settings_file: click.Path, output_dir: Optional[click.Path]):
 @settings_file
 @output_dir()
 @click.option("--clean", "-c", is_flag=True, help="Run `clean` before building.")
+@click.option(
+    "--pipeline",
+    "-P",
+    is_flag=True,
+    help="Overlap disk reads and writes with rendering using an asyncio pipeline.",
+)
+@click.option(
+    "--shard",
+    callback=parse_shard,
+    help="Only build slice i of N (e.g. 2/4) and write a shard manifest.",
+)
+@click.option(
+    "--low-memory",
+    is_flag=True,
+    help="Keep only front matter in memory, reading page bodies when used and "
+    "dropping them once written.",
+)
+@click.option(
+    "--check-links", is_flag=True, help="Check internal links after building."
+)
+@click.option(
+    "--archive",
+    type=click.Path(dir_okay=False),
+    help="Build into a .zip or .tar(.gz/.bz2/.xz) archive instead of output_dir.",
+)
+@click.option(
+    "--prune/--no-prune",
+    default=True,
+    show_default=True,
+    help="Delete outputs of earlier builds that this build no longer produces.",
+)
+@click.option(
+    "--only",
+    multiple=True,
+    help="Only render pages matching a path glob under content_dir, "
+    "collection:<name> or template:<name>. Can be repeated.",
+)
+@click.option(
+    "--skip-assets",
+    is_flag=True,
+    help="Don't compile Sass, copy files or write the asset manifest.",
+)
 @click.pass_context
 def build(
-    ctx, settings_file: click.Path, output_dir: Optional[click.Path], clean: bool
+    ctx,
+    settings_file: click.Path,
+    output_dir: Optional[click.Path],
+    clean: bool,
+    pipeline: bool,
+    shard: Optional[Shard],
+    low_memory: bool,
+    check_links: bool,
+    archive: Optional[str],
+    prune: bool,
+    only: Tuple[str, ...],
+    skip_assets: bool,
 ):
     """Build website and save to the output directory."""
     ctx.ensure_object(dict)
     ctx.obj = populate_context(settings_file, output_dir)
 
-    site = Site.from_settings_file(ctx.obj["settings_file"], ctx.obj["output_dir"])
+    if archive is not None:
+        if (
+            pipeline
+            or shard is not None
+            or check_links
+            or clean
+            or skip_assets
+            or not prune
+        ):
+            raise click.UsageError(
+                "--archive can't be combined with --pipeline, --shard, --check-links, "
+                "--clean, --skip-assets or --no-prune"
+            )
+        try:
+            archive_format(Path(archive))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--archive")
+    if only and (shard is not None or check_links or archive is not None):
+        raise click.UsageError(
+            "--only can't be combined with --shard, --check-links or --archive"
+        )
+    if shard is not None and check_links:
+        raise click.UsageError("--check-links needs a full build, not a shard")
+    site = Site.from_settings_file(
+        ctx.obj["settings_file"],
+        ctx.obj["output_dir"],
+        low_memory=low_memory,
+        selector=PageSelector.from_strings(only) if only else None,
+        lazy_content=pipeline,
+    )
+    if archive is not None:
+        site.build_archive(Path(archive))
+        return
     if clean:
         site.clean()
-    site.build()
+    site.build(pipelined=pipeline, shard=shard, prune=prune, assets=not skip_assets)
+    if check_links:
+        _check_links(site)
+
+
+def _check_links(site: Site, workers: Optional[int] = None):
+    broken = site.check_links(workers)
+    if broken:
+        raise click.ClickException(f"{len(broken)} broken links")
+
+
+@cli.command("prune")
+@settings_file
+@output_dir()
+@click.option(
+    "--dry-run", "-n", is_flag=True, help="List stale outputs without deleting them."
+)
+@click.pass_context
+def prune_command(
+    ctx, settings_file: click.Path, output_dir: Optional[click.Path], dry_run: bool
+):
+    """Delete outputs recorded by earlier builds that the site no longer generates.
+    The pruned outputs are listed on stdout.
+
+    Builds record their outputs in .mudi_outputs.json in the output directory, which
+    deploys should exclude."""
+    # keep stdout to the list of outputs so it can be piped
+    log_to_stderr()
+    ctx.ensure_object(dict)
+    ctx.obj = populate_context(settings_file, output_dir)
+    site = Site.from_settings_file(
+        ctx.obj["settings_file"], ctx.obj["output_dir"], low_memory=True
+    )
+    for output in site.prune(dry_run=dry_run):
+        click.echo(output)
+
+
+@cli.command("check-links")
+@settings_file
+@output_dir("Built output directory to check.")
+@click.option("--workers", "-w", type=int, help="Parser processes.")
+@click.pass_context
+def check_links_command(
+    ctx,
+    settings_file: click.Path,
+    output_dir: Optional[click.Path],
+    workers: Optional[int],
+):
+    """Check internal links and anchors in the built site."""
+    ctx.ensure_object(dict)
+    ctx.obj = populate_context(settings_file, output_dir)
+    site = Site.from_settings_file(
+        ctx.obj["settings_file"], ctx.obj["output_dir"], low_memory=True
+    )
+    _check_links(site, workers)
+
+
+@cli.command("build-many")
+@click.argument("settings_files", nargs=-1, required=True)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Worker processes. With 1, every site is built in this process.",
+)
+@click.option(
+    "--cache_dir",
+    type=click.Path(),
+    default=".mudi_cache",
+    show_default=True,
+    help="Where the shared highlighting cache is kept.",
+)
+@click.option(
+    "--relative-to-settings",
+    is_flag=True,
+    help="Resolve each site's paths relative to its settings file's directory.",
+)
+@click.option("--clean", "-c", is_flag=True, help="Run `clean` before each build.")
+def build_many_command(
+    settings_files: Tuple[str, ...],
+    workers: int,
+    cache_dir: str,
+    relative_to_settings: bool,
+    clean: bool,
+):
+    """Build every site whose settings file is given, as paths or globs."""
+    tic = time.perf_counter()
+    results = build_many(
+        expand_settings_files(list(settings_files)),
+        workers=workers,
+        cache_dir=Path(cache_dir).resolve(),
+        relative_to_settings=relative_to_settings,
+        clean=clean,
+    )
+    toc = time.perf_counter()
+    for result in results:
+        status = "failed" if result["error"] else f"{result['pages']} pages"
+        logging.info(f"{result['settings_file']}: {status} in {result['seconds']}s")
+    failures = [result for result in results if result["error"]]
+    logging.info(
+        f"built {len(results) - len(failures)}/{len(results)} sites, "
+        f"{sum(result['pages'] for result in results)} pages in {tictoc(tic, toc)}s"
+    )
+    if failures:
+        raise click.ClickException(
+            "failed to build "
+            + ", ".join(f"{r['settings_file']} ({r['error']})" for r in failures)
+        )
+
+
+@cli.command("merge-shards")
+@click.argument("shard_dirs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output_dir",
+    "-o",
+    required=True,
+    type=click.Path(),
+    help="Where the merged site is saved.",
+)
+def merge_shards_command(shard_dirs: Tuple[str, ...], output_dir: str):
+    """Combine the output directories of `build --shard` runs."""
+    try:
+        merge_shards([Path(shard_dir) for shard_dir in shard_dirs], Path(output_dir))
+    except ShardMergeError as e:
+        raise click.ClickException(str(e))
 
 
 @cli.command()
@@ -102,13 +357,102 @@ def build(
 @click.option(
     "--port", "-p", type=int, default=8080, help="Port to serve directory from."
 )
+@click.option(
+    "--live-reload",
+    "-r",
+    is_flag=True,
+    help="Build and watch the site, reloading browsers when their page changes.",
+)
+@metrics_port
 @click.pass_context
-def serve(ctx, settings_file: click.Path, output_dir: Optional[click.Path], port: int):
+def serve(
+    ctx,
+    settings_file: click.Path,
+    output_dir: Optional[click.Path],
+    port: int,
+    live_reload: bool,
+    metrics_port: Optional[int],
+):
     """Locally serve your site from its output_dir."""
     ctx.ensure_object(dict)
     ctx.obj = populate_context(settings_file, output_dir)
-    settings = MudiSettings(ctx.obj["settings_file"], ctx.obj["output_dir"])
-    serve_directory(settings.site_settings.output_dir, port)
+    metrics = start_metrics(metrics_port)
+    if live_reload:
+        site = Site.from_settings_file(ctx.obj["settings_file"], ctx.obj["output_dir"])
+        broker = ReloadBroker()
+        dispatcher = MudiDispatcher(site, broker, metrics)
+        site.build()
+        threading.Thread(target=dispatcher.watch, daemon=True).start()
+        serve_directory(
+            site.output_dir,
+            port,
+            LiveReloadRequestHandler,
+            LiveReloadServer,
+            broker=broker,
+            metrics=metrics,
+        )
+    else:
+        settings = MudiSettings(ctx.obj["settings_file"], ctx.obj["output_dir"])
+        serve_directory(settings.site_settings.output_dir, port, metrics=metrics)
+
+
+@cli.command("bench-serve")
+@settings_file
+@output_dir("Built output directory to serve.")
+@click.option(
+    "--concurrency",
+    "-c",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Client threads.",
+)
+@click.option(
+    "--requests",
+    "-n",
+    type=int,
+    default=1000,
+    show_default=True,
+    help="Requests in the warm run.",
+)
+@click.option("--threaded", is_flag=True, help="Benchmark the threaded server instead.")
+@click.option(
+    "--report", type=click.Path(), help="Write the JSON report here instead of stdout."
+)
+@click.pass_context
+def bench_serve_command(
+    ctx,
+    settings_file: click.Path,
+    output_dir: Optional[click.Path],
+    concurrency: int,
+    requests: int,
+    threaded: bool,
+    report: Optional[click.Path],
+):
+    """Load test the dev server on a built site and print a JSON report."""
+    if report is None:
+        # keep stdout pure JSON so the report can be piped
+        log_to_stderr()
+    ctx.ensure_object(dict)
+    ctx.obj = populate_context(settings_file, output_dir)
+    site = Site.from_settings_file(
+        ctx.obj["settings_file"], ctx.obj["output_dir"], low_memory=True
+    )
+    if not site.output_dir.is_dir():
+        raise click.ClickException(f"{site.output_dir} does not exist, run build first")
+    results = bench_serve(
+        site.output_dir,
+        site_urls(site),
+        concurrency=concurrency,
+        requests=requests,
+        ServerClass=ThreadingDirectoryServer if threaded else DirectoryServer,
+    )
+    if report is not None:
+        with open(str(report), "w") as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"wrote report to {report}")
+    else:
+        click.echo(json.dumps(results, indent=2))
 
 
 @cli.command()
@@ -117,15 +461,20 @@ def serve(ctx, settings_file: click.Path, output_dir: Optional[click.Path], port
 @click.option(
     "--clean", "-c", is_flag=True, help="Run `clean` and `build` before watching."
 )
+@metrics_port
 @click.pass_context
 def watch(
-    ctx, settings_file: click.Path, output_dir: Optional[click.Path], clean: bool
+    ctx,
+    settings_file: click.Path,
+    output_dir: Optional[click.Path],
+    clean: bool,
+    metrics_port: Optional[int],
 ):
     """Watch input_dir and rebuild when changes are detected."""
     ctx.ensure_object(dict)
     ctx.obj = populate_context(settings_file, output_dir)
     site = Site.from_settings_file(ctx.obj["settings_file"], ctx.obj["output_dir"])
-    dispatcher = MudiDispatcher(site)
+    dispatcher = MudiDispatcher(site, metrics=start_metrics(metrics_port))
     if clean:
         site.clean()
         site.build()
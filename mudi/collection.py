@@ -1,4 +1,4 @@
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 from .models.collection import CollectionSettings
 from .page import Page
@@ -19,34 +19,53 @@ class Collection:
         self.sort_key = sort_key
         self.sort_descending = sort_descending
         self.sort_default = sort_default
+        # derived views of _pages, dropped whenever the collection is mutated
+        self._cache: Dict[Hashable, Any] = {}
 
     @classmethod
     def from_collection_settings(cls, settings: CollectionSettings):
         return cls(**settings.dict())
 
+    def _memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute()
+            return value
+        except TypeError:
+            # unhashable arguments, e.g. a list as a sort default
+            return compute()
+
     @property
     def pages(self):
-        # TODO: figure out a way to cache this intelligently
         if self.sorted:
-            return self._sorted_by(
-                self.sort_key, self.sort_descending, self.sort_default
+            return self._memoize(
+                ("pages",),
+                lambda: self._sorted_by(
+                    self.sort_key, self.sort_descending, self.sort_default
+                ),
             )
         else:
             return self._pages
 
     def __iter__(self):
-        self._iter_index = -1
-        return self
+        # iterate over a fresh iterator so memoized collections can be nested in loops
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self._pages)
 
-    def __next__(self):
-        self._iter_index += 1
-        if self._iter_index >= len(self._pages):
-            raise StopIteration
-        return self.pages[self._iter_index]
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._memoize(
+                ("slice", index.start, index.stop, index.step),
+                lambda: self.pages[index],
+            )
+        return self.pages[index]
 
     def __contains__(self, key):
         if isinstance(key, str):
-            return key in [page.name for page in self._pages]
+            return key in self._page_indices()
         elif isinstance(key, Page):
             return key in self._pages
         else:
@@ -54,9 +73,11 @@ class Collection:
 
     def append(self, page: Page):
         self._pages.append(page)
+        self._cache.clear()
 
     def remove(self, page: Page):
         self._pages.remove(page)
+        self._cache.clear()
 
     def _sorted_by(self, key: str, descending: bool = True, default: Any = None):
         if not len(self._pages):
@@ -71,15 +92,25 @@ class Collection:
     ) -> "Collection":
         if not len(self._pages):
             return self
-        sorted_pages = self._sorted_by(key, descending, default)
-        return Collection(name=self.name, pages=sorted_pages)
+        return self._memoize(
+            ("sorted_by", key, descending, default),
+            lambda: Collection(
+                name=self.name, pages=self._sorted_by(key, descending, default)
+            ),
+        )
+
+    def _page_indices(self) -> Dict[str, int]:
+        return self._memoize(
+            ("page_indices",),
+            lambda: {page.name: index for index, page in enumerate(self.pages)},
+        )
 
     def page(self, key: str) -> Page:
-        if key not in self:
+        page_indices = self._page_indices()
+        if key not in page_indices:
             raise KeyError(f"Collection has no page named {key}")
-        else:
-            page = list(filter(lambda p: p.name == key, self._pages))[0]
-        this_index = self.pages.index(page)
+        this_index = page_indices[key]
+        page = self.pages[this_index]
         next_index = this_index + 1
         prev_index = this_index - 1
         if next_index < len(self._pages):
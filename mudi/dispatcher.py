@@ -1,59 +1,116 @@
 import logging
 from pathlib import Path
+import time
+from typing import Optional, Set
 import watchgod
 
+from .metrics import Metrics
+from .reload import ReloadBroker
 from .site import Site
-from .utils import rel_name
 from .watcher import MudiWatcher
 
 
 class MudiDispatcher:
-    def __init__(self, site: Site):
+    def __init__(
+        self,
+        site: Site,
+        broker: Optional[ReloadBroker] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self.site = site
+        self.broker = broker
+        self.metrics = metrics
+        self.site.metrics = metrics
 
-    def _dispatch(self, change_type: watchgod.Change, path: Path):
+    def _dispatch(self, change_type: watchgod.Change, path: Path) -> Optional[str]:
+        """Dispatch one change and return its kind, or `None` if it was ignored."""
         if self.site.template_dir in path.parents:
             self._dispatch_template(change_type, path)
+            return "template"
         elif self.site.sass_in in path.parents:
             self._dispatch_sass(change_type, path)
+            return "sass"
         elif self.site.content_dir in path.parents:
             if path.suffix in [".html", ".md"]:
                 self._dispatch_page(change_type, path)
+                return "page"
             else:
                 self._dispatch_file(change_type, path)
+                return "file"
+        return None
 
     def _dispatch_template(self, change_type: watchgod.Change, path: Path):
         logging.info("reinitializing jinja")
         self.site._get_jinja_env()
         self.site.render_all_pages()
+        self.site.render_taxonomy_pages()
 
     def _dispatch_sass(self, change_type: watchgod.Change, path: Path):
         self.site.compile_sass()
+        self._refresh_fingerprints()
 
     def _dispatch_page(self, change_type: watchgod.Change, path: Path):
         if change_type.name == "added":
             self.site.add_page_from_file(path)
             self.site.render_all_pages()
+            self.site.render_taxonomy_pages(changed_only=True)
         elif change_type.name == "modified":
             self.site.remove_page_from_file(path)
             self.site.add_page_from_file(path)
             self.site.render_all_pages()
+            self.site.render_taxonomy_pages(changed_only=True)
         elif change_type.name == "deleted":
             self.site.remove_page_from_file(path)
             self.site.render_all_pages()
+            self.site.render_taxonomy_pages(changed_only=True)
 
     def _dispatch_file(self, change_type: watchgod.Change, path: Path):
-        path = rel_name(path, self.site.content_dir)
+        path = path.relative_to(self.site.content_dir)
         if change_type.name in ["added", "modified"]:
             self.site.copy_file(path)
         else:
-            self.site.delete_file(path)
+            self.site.delete_copied_file(path)
+        self._refresh_fingerprints()
+
+    def _refresh_fingerprints(self):
+        # pages embed fingerprinted asset URLs, so they go stale when an asset changes
+        if self.site.fingerprinter is not None:
+            self.site.write_asset_manifest()
+            self.site.render_all_pages()
+
+    def _publish(self):
+        written_outputs = self.site.pop_written_outputs()
+        if self.broker is not None and written_outputs:
+            self.broker.publish(
+                "/" + output.relative_to(self.site.output_dir).as_posix()
+                for output in written_outputs
+            )
 
     def watch(self):
+        self.site.pop_written_outputs()
         for changes in watchgod.watch(
             ".", watcher_cls=MudiWatcher, watcher_kwargs={"site": self.site}
         ):
+            tic = time.perf_counter()
+            pages_rendered = self.site.pages_rendered
+            kinds = set()
             for change_type, path in changes:
                 logging.info(f"{path} {change_type.name}")
                 path = Path(path)
-                self._dispatch(change_type, path)
+                kinds.add(self._dispatch(change_type, path))
+            self.site.save_caches()
+            self._publish()
+            if self.metrics is not None:
+                self._observe_batch(self.metrics, kinds, tic, pages_rendered)
+
+    def _observe_batch(
+        self,
+        metrics: Metrics,
+        kinds: Set[Optional[str]],
+        tic: float,
+        pages_rendered: int,
+    ):
+        seconds = time.perf_counter() - tic
+        for kind in kinds - {None}:
+            metrics.batch_seconds.observe(seconds, kind)
+        metrics.batch_pages.observe(self.site.pages_rendered - pages_rendered)
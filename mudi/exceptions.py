@@ -1,2 +1,10 @@
 class NotInitializedError(Exception):
     pass
+
+
+class ShardMergeError(Exception):
+    pass
+
+
+class TaxonomyError(Exception):
+    pass
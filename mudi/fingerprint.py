@@ -0,0 +1,97 @@
+import hashlib
+import json
+from pathlib import Path, PurePosixPath
+import re
+import threading
+from typing import Dict, Optional
+
+from .cache import FileCache
+from .models.fingerprint import FingerprintSettings
+
+FINGERPRINT_LENGTH = 12
+FINGERPRINTED_PATH = re.compile(r"\.[0-9a-f]{%d}\.[^./]+$" % FINGERPRINT_LENGTH)
+
+
+def is_fingerprinted(url_path: str) -> bool:
+    return FINGERPRINTED_PATH.search(url_path) is not None
+
+
+class Fingerprinter:
+    def __init__(
+        self, settings: FingerprintSettings, cache_file: Optional[Path] = None
+    ):
+        """Renames assets to `name.<hash>.ext` after their content and keeps the
+        manifest of logical to fingerprinted paths used by the `asset()` template
+        helper.
+
+        Args:
+            settings (`FingerprintSettings`): Where the manifest is written.
+            cache_file (`Path`, optional): Persists file hashes between builds, keyed on
+                path, size and modification time, so only changed files are rehashed.
+
+        Attributes:
+            manifest (`Dict[str, str]`): Maps logical asset paths, relative to the output
+                directory, to their fingerprinted paths.
+            previous_manifest (`Dict[str, str]`): The manifest written by an earlier
+                build, used to find the outputs of assets deleted before this process
+                has built them, as when watching without building first.
+
+        """
+        self.settings = settings
+        self.hashes = FileCache(cache_file)
+        self.manifest: Dict[str, str] = {}
+        self.previous_manifest: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def includes(self, logical_path: str) -> bool:
+        """Whether the asset at `logical_path` is fingerprinted, according to the
+        `include` and `exclude` globs. Globs without a `/` match the file name at
+        any depth."""
+        path = PurePosixPath(logical_path)
+        return any(
+            path.match(pattern) for pattern in self.settings.include
+        ) and not any(path.match(pattern) for pattern in self.settings.exclude)
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+
+    def hash_file(self, filename: Path) -> str:
+        stat = filename.stat()
+        key = FileCache.make_key(str(filename), stat.st_size, stat.st_mtime_ns)
+        digest = self.hashes.get(key)
+        if digest is None:
+            with open(filename, "rb") as f:
+                digest = self.hash_bytes(f.read())
+            self.hashes.set(key, digest)
+        return digest
+
+    def add(self, logical_path: str, digest: str) -> str:
+        path = PurePosixPath(logical_path)
+        fingerprinted = str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+        with self._lock:
+            self.manifest[logical_path] = fingerprinted
+        return fingerprinted
+
+    def discard(self, logical_path: str) -> str:
+        with self._lock:
+            previous = self.previous_manifest.pop(logical_path, logical_path)
+            return self.manifest.pop(logical_path, previous)
+
+    def load_previous_manifest(self, output_dir: Path):
+        try:
+            with open(output_dir / self.settings.manifest) as f:
+                self.previous_manifest = json.load(f)
+        except (OSError, ValueError):
+            self.previous_manifest = {}
+
+    def manifest_json(self) -> str:
+        with self._lock:
+            return json.dumps(self.manifest, indent=2, sort_keys=True)
+
+    def write_manifest(self, output_dir: Path) -> Path:
+        manifest_filename = output_dir / self.settings.manifest
+        manifest_filename.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_filename, "w") as f:
+            f.write(self.manifest_json())
+        return manifest_filename
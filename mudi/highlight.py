@@ -0,0 +1,135 @@
+from markdown.extensions import Extension
+from markdown.extensions.attr_list import AttrListExtension
+from markdown.extensions.codehilite import CodeHiliteExtension, HiliteTreeprocessor
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from typing import Callable, Optional
+import xml.etree.ElementTree as etree
+
+from .cache import FileCache
+
+try:
+    from pygments import __version__ as pygments_version
+except ImportError:  # pragma: no cover
+    pygments_version = None
+
+# the names and priorities the codehilite and fenced_code extensions register under
+HILITE_PRIORITY = 30
+FENCED_CODE_PRIORITY = 25
+
+
+class HighlightCache(FileCache):
+    """A cache of highlighted code blocks, keyed by language, source, highlighting
+    options and Pygments version."""
+
+
+def _stash_one(md, highlight: Callable[[], None]) -> Optional[str]:
+    """Run `highlight` and return the html it stashed, or `None` unless it stashed
+    exactly one block, e.g. for a malformed fence left as written."""
+    before = md.htmlStash.html_counter
+    highlight()
+    if md.htmlStash.html_counter != before + 1:
+        return None
+    return md.htmlStash.rawHtmlBlocks[before]
+
+
+class CachedHiliteTreeprocessor(HiliteTreeprocessor):
+    cache: HighlightCache
+
+    def run(self, root):
+        highlight = super().run
+        for block in list(root.iter("pre")):
+            if len(block) != 1 or block[0].tag != "code" or block[0].text is None:
+                continue
+            key = HighlightCache.make_key(
+                pygments_version,
+                "hilite",
+                self.md.tab_length,
+                sorted(self.config.items()),
+                block[0].text,
+            )
+            html = self.cache.get(key)
+            if html is None:
+                # highlight a copy on its own so the stashed html is this block's
+                wrapper = etree.Element("div")
+                pre = etree.SubElement(wrapper, "pre")
+                etree.SubElement(pre, "code").text = block[0].text
+                html = _stash_one(self.md, lambda: highlight(wrapper))
+                if html is None:
+                    continue
+                self.cache.set(key, html)
+                placeholder = pre.text
+            else:
+                placeholder = self.md.htmlStash.store(html)
+            # as HiliteTreeprocessor does, the placeholder paragraph is replaced
+            # with the stashed html later
+            block.clear()
+            block.tag = "p"
+            block.text = placeholder
+
+
+class CachedFencedBlockPreprocessor(FencedBlockPreprocessor):
+    cache: HighlightCache
+
+    def _key(self, fence: str) -> str:
+        extension_configs = sorted(
+            (type(extension).__name__, sorted(extension.getConfigs().items()))
+            for extension in self.md.registeredExtensions
+            if isinstance(extension, (CodeHiliteExtension, AttrListExtension))
+        )
+        return HighlightCache.make_key(
+            pygments_version,
+            "fenced_code",
+            sorted(self.config.items()),
+            extension_configs,
+            fence,
+        )
+
+    def run(self, lines):
+        highlight = super().run
+        text = "\n".join(lines)
+        index = 0
+        while True:
+            m = self.FENCED_BLOCK_RE.search(text, index)
+            if m is None:
+                break
+            key = self._key(m.group(0))
+            html = self.cache.get(key)
+            if html is None:
+                # highlight the fence on its own so the stashed html is this block's
+                fence = m.group(0).split("\n")
+                html = _stash_one(self.md, lambda: highlight(fence))
+                if html is None:
+                    index = m.start() + 1
+                    continue
+                self.cache.set(key, html)
+                placeholder = self.md.htmlStash.get_placeholder(
+                    self.md.htmlStash.html_counter - 1
+                )
+            else:
+                placeholder = self.md.htmlStash.store(html)
+            text = f"{text[:m.start()]}\n{placeholder}\n{text[m.end():]}"
+            index = m.start() + 1 + len(placeholder)
+        return text.split("\n")
+
+
+class HighlightCacheExtension(Extension):
+    def __init__(self, cache: HighlightCache, **kwargs):
+        """Caches highlighted code blocks for one `Markdown` instance, by replacing
+        the codehilite and fenced_code processors with subclasses that look each
+        block up in `cache` before highlighting it. Must be registered after those
+        extensions."""
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def extendMarkdown(self, md):
+        if "hilite" in md.treeprocessors:
+            hiliter = CachedHiliteTreeprocessor(md)
+            hiliter.config = md.treeprocessors["hilite"].config
+            hiliter.cache = self.cache
+            md.treeprocessors.register(hiliter, "hilite", HILITE_PRIORITY)
+        if "fenced_code_block" in md.preprocessors:
+            fenced = CachedFencedBlockPreprocessor(
+                md, md.preprocessors["fenced_code_block"].config
+            )
+            fenced.cache = self.cache
+            md.preprocessors.register(fenced, "fenced_code_block", FENCED_CODE_PRIORITY)
@@ -0,0 +1,169 @@
+import codecs
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from html.parser import HTMLParser
+import logging
+from pathlib import Path
+import posixpath
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from .cache import FileCache
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BrokenLink(NamedTuple):
+    page: str
+    link: str
+    reason: str
+
+
+class LinkExtractor(HTMLParser):
+    def __init__(self):
+        """Collects `href`/`src` values and anchor targets (`id`, `<a name>`) from HTML
+        fed to it incrementally."""
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.anchors: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name in ["href", "src"]:
+                self.links.append(value)
+            elif name == "id" or (name == "name" and tag == "a"):
+                self.anchors.append(value)
+
+    handle_startendtag = handle_starttag
+
+
+def extract_links(filename: Path) -> Tuple[List[str], List[str]]:
+    """Stream an HTML file through a `LinkExtractor`. Module level so it can run in
+    a process pool.
+
+    Returns:
+        Tuple[List[str], List[str]]: The page's links and its anchor targets.
+
+    """
+    extractor = LinkExtractor()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            extractor.feed(decoder.decode(chunk))
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.links, extractor.anchors
+
+
+def _file_digest(filename: Path) -> str:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _resolve(page_url: str, link: str) -> Optional[Tuple[str, str]]:
+    """Resolve `link` on `page_url` to an output path and fragment, or `None` if it
+    points outside the site."""
+    parts = urlsplit(link)
+    if parts.scheme or parts.netloc or link.startswith("//"):
+        return None
+    path = unquote(urljoin(page_url, parts.path)) if parts.path else page_url
+    path = posixpath.normpath(path)
+    if link.split("#")[0].split("?")[0].endswith("/") and path != "/":
+        path += "/"
+    if path.endswith("/"):
+        path += "index.html"
+    return path.lstrip("/"), unquote(parts.fragment)
+
+
+class LinkChecker:
+    def __init__(self, output_dir: Path, cache: Optional[FileCache] = None):
+        """Checks internal links in built HTML against the set of paths a site
+        generates. Pages are parsed in parallel, and the links and anchors of each
+        page are cached by a hash of its content so only changed pages are parsed
+        again.
+
+        Args:
+            output_dir (`Path`): The directory the site was built into.
+            cache (`FileCache`, optional): Scan results from earlier runs.
+
+        """
+        self.output_dir = output_dir
+        self.cache = cache if cache is not None else FileCache()
+
+    def scan(
+        self, pages: List[str], workers: Optional[int] = None
+    ) -> Dict[str, Tuple[List[str], List[str]]]:
+        """Return the links and anchors of each page, given as output paths. Pages
+        missing from `output_dir` are left out."""
+        results: Dict[str, Tuple[List[str], List[str]]] = {}
+        to_parse: List[Tuple[str, str]] = []
+        for page in pages:
+            if not (self.output_dir / page).is_file():
+                continue
+            digest = _file_digest(self.output_dir / page)
+            cached = self.cache.get(digest)
+            if cached is not None:
+                results[page] = (cached["links"], cached["anchors"])
+            else:
+                to_parse.append((page, digest))
+
+        filenames = [self.output_dir / page for page, _ in to_parse]
+        if workers == 1 or len(filenames) < 2:
+            parsed = [extract_links(filename) for filename in filenames]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(extract_links, filenames, chunksize=16))
+        for (page, digest), (links, anchors) in zip(to_parse, parsed):
+            self.cache.set(digest, {"links": links, "anchors": anchors})
+            results[page] = (links, anchors)
+        logging.info(
+            f"scanned {len(results)} pages for links ({len(to_parse)} parsed, "
+            f"{len(results) - len(to_parse)} cached)"
+        )
+        return results
+
+    def check(
+        self, outputs: Set[str], workers: Optional[int] = None
+    ) -> List[BrokenLink]:
+        """Check every link in the HTML files among `outputs`, the output paths the
+        site generates, relative to `output_dir`. Generated pages missing from
+        `output_dir`, e.g. because the site wasn't rebuilt after adding them, are
+        reported rather than checked."""
+        pages = sorted(output for output in outputs if output.endswith(".html"))
+        scanned = self.scan(pages, workers)
+        anchors = {
+            page: set(page_anchors) for page, (_, page_anchors) in scanned.items()
+        }
+        built: Dict[str, bool] = {}
+
+        def is_built(target: str) -> bool:
+            if target not in built:
+                built[target] = (self.output_dir / target).is_file()
+            return built[target]
+
+        broken = []
+        for page in pages:
+            if page not in scanned:
+                broken.append(
+                    BrokenLink(page, "", "is generated but missing, rebuild the site")
+                )
+                continue
+            for link in scanned[page][0]:
+                resolved = _resolve("/" + page, link)
+                if resolved is None:
+                    continue
+                target, fragment = resolved
+                if target not in outputs:
+                    broken.append(BrokenLink(page, link, f"{target} is not generated"))
+                elif not is_built(target):
+                    broken.append(BrokenLink(page, link, f"{target} is not built"))
+                elif fragment and target in anchors and fragment not in anchors[target]:
+                    broken.append(
+                        BrokenLink(page, link, f"{target} has no #{fragment}")
+                    )
+        return broken
@@ -10,6 +10,19 @@ def load_md_file(filename: Union[str, Path]) -> Tuple[str, dict]:
     return result.content, result.metadata
 
 
+def load_md_metadata(filename: Union[str, Path]) -> dict:
+    """Load only the YAML front matter of a markdown file, without keeping its body."""
+    with open(filename, "r") as f:
+        lines = [f.readline()]
+        if lines[0].strip() != "---":
+            return load_md_file(filename)[1] if lines[0].strip() == "+++" else {}
+        for line in f:
+            lines.append(line)
+            if line.strip() == "---":
+                break
+    return frontmatter.parse("".join(lines))[0]
+
+
 def load_html_file(filename: Union[str, Path]) -> Tuple[str, dict]:
     with open(filename, "r") as f:
         content = f.read()
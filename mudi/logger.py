@@ -26,3 +26,10 @@ LOGGING_CONFIG = {
 
 def setup_logger(level=logging.INFO):
     logging.config.dictConfig(LOGGING_CONFIG)
+
+
+def log_to_stderr():
+    """Move console logging to stderr, for commands whose stdout is data."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.stream = sys.stderr
@@ -6,12 +6,18 @@ from markdown.extensions.smarty import SmartyExtension
 from markdown.extensions.toc import TocExtension
 from markdown_checklist.extension import ChecklistExtension
 from mdx_truly_sane_lists.mdx_truly_sane_lists import TrulySaneListExtension
+from typing import Optional
 
+from .highlight import HighlightCache, HighlightCacheExtension
 from .models.markdown import MarkdownSettings
 
 
 class MarkdownRenderer(Markdown):
-    def __init__(self, settings: MarkdownSettings):
+    def __init__(
+        self,
+        settings: MarkdownSettings,
+        highlight_cache: Optional[HighlightCache] = None,
+    ):
         self.settings = settings
         self.extensions = []
 
@@ -40,6 +46,14 @@ class MarkdownRenderer(Markdown):
                 TrulySaneListExtension(**self.settings.truly_sane_lists_options)
             )
 
+        # registered last so the processors it caches for already exist
+        if (
+            self.settings.enable_codehilite
+            and self.settings.cache_codehilite
+            and highlight_cache is not None
+        ):
+            self.extensions.append(HighlightCacheExtension(highlight_cache))
+
         super().__init__(
             output_format=self.settings.output_format,
             tab_length=self.settings.tab_length,
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from .collection import Collection
+from .page import Page
+
+
+class ContextCache:
+    def __init__(self, pages: Optional[Mapping[str, Page]] = None):
+        """Memoizes expensive queries made from templates for the duration of a build.
+
+        Results are keyed on the identity of the object queried plus the query
+        arguments, so repeated calls such as `pages|sorted_by("date")` from a shared
+        header are computed once. Only objects that live as long as the site, its
+        `pages` mapping and its collections, are memoized; temporaries such as
+        `pages.values()|list` would never be queried again. The site clears the
+        cache whenever pages are added or removed.
+
+        Args:
+            pages (`Mapping[str, Page]`, optional): The site's pages.
+
+        """
+        self.pages = pages
+        self._entries: Dict[Tuple[Hashable, ...], Tuple[Any, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def _is_stable(self, obj: Any) -> bool:
+        return isinstance(obj, Collection) or (
+            self.pages is not None and obj is self.pages
+        )
+
+    def memoize(
+        self, name: str, obj: Any, args: Tuple, compute: Callable[[], Any]
+    ) -> Any:
+        if not self._is_stable(obj):
+            return compute()
+        key = (name, id(obj)) + args
+        try:
+            entry = self._entries.get(key)
+        except TypeError:
+            # unhashable arguments can't be memoized
+            return compute()
+        # entries keep obj alive, so its id can't be reused while they exist
+        if entry is not None and entry[0] is obj:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        result = compute()
+        self._entries[key] = (obj, result)
+        return result
+
+    def filters(self) -> Dict[str, Callable]:
+        return {"sorted_by": self.sorted_by, "group_by": self.group_by}
+
+    def sorted_by(
+        self, value: Any, key: str, descending: bool = True, default: Any = None
+    ) -> Any:
+        """Jinja filter sorting a collection, a `{name: page}` mapping such as
+        `pages`, or a list of pages by a page attribute."""
+        if isinstance(value, Collection):
+            return value.sorted_by(key, descending, default)
+        return self.memoize(
+            "sorted_by",
+            value,
+            (key, descending, default),
+            lambda: sorted(
+                _iter_pages(value),
+                key=lambda page: page.get(key, default),
+                reverse=descending,
+            ),
+        )
+
+    def group_by(self, value: Any, key: str, default: Any = None) -> Dict[Any, List]:
+        """Jinja filter grouping pages by a page attribute. Pages whose attribute is a
+        list, like tags, appear under each of its items."""
+
+        def compute() -> Dict[Any, List]:
+            groups: Dict[Any, List] = defaultdict(list)
+            for page in _iter_pages(value):
+                attribute = page.get(key, default)
+                for item in attribute if isinstance(attribute, list) else [attribute]:
+                    groups[item].append(page)
+            return dict(groups)
+
+        return self.memoize("group_by", value, (key, default), compute)
+
+
+def _iter_pages(value: Any) -> Iterable[Page]:
+    if isinstance(value, Mapping):
+        return value.values()
+    return value
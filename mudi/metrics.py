@@ -0,0 +1,148 @@
+from bisect import bisect_left
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import logging
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from .utils import current_rss_bytes
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Sequence[str] = (),
+    ):
+        """A cumulative histogram in the Prometheus data model.
+
+        Args:
+            name (`str`): The metric name.
+            documentation (`str`): The `# HELP` text.
+            buckets (`Sequence[float]`): Sorted upper bounds; `+Inf` is implied.
+            label_names (`Sequence[str]`): Names of the labels observations carry.
+
+        """
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        # label values -> (per-bucket counts including +Inf, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(
+                label_values, ([0] * (len(self.buckets) + 1), 0.0)
+            )
+            counts[index] += 1
+            self._series[label_values] = (counts, total + value)
+
+    def _labels(self, label_values: Tuple[str, ...], **extra: str) -> str:
+        pairs = list(zip(self.label_names, label_values)) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def exposition(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(
+                    f"{self.name}_bucket{self._labels(label_values, le=le)} {cumulative}"
+                )
+            labels = self._labels(label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        """The metrics exported by long-running `watch` and `serve` processes. Code
+        paths only record into it when one has been attached, so disabled metrics
+        cost a `None` check."""
+        self.batch_seconds = Histogram(
+            "mudi_dispatch_batch_seconds",
+            "Time from receiving a batch of changes to finishing its rebuild.",
+            LATENCY_BUCKETS,
+            ["change_type"],
+        )
+        self.batch_pages = Histogram(
+            "mudi_dispatch_batch_pages_rendered",
+            "Pages rendered while handling a batch of changes.",
+            COUNT_BUCKETS,
+        )
+        self.render_seconds = Histogram(
+            "mudi_render_page_seconds",
+            "Time taken by Site.render_page.",
+            LATENCY_BUCKETS,
+        )
+        self.request_seconds = Histogram(
+            "mudi_http_request_seconds",
+            "Time taken to handle a request to the dev server.",
+            LATENCY_BUCKETS,
+            ["status"],
+        )
+
+    def exposition(self) -> str:
+        lines: List[str] = []
+        for histogram in [
+            self.batch_seconds,
+            self.batch_pages,
+            self.render_seconds,
+            self.request_seconds,
+        ]:
+            lines += histogram.exposition()
+        rss = current_rss_bytes()
+        if rss is not None:
+            lines += [
+                "# HELP mudi_process_resident_memory_bytes Resident set size.",
+                "# TYPE mudi_process_resident_memory_bytes gauge",
+                f"mudi_process_resident_memory_bytes {rss}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.server.metrics.exposition().encode("utf-8")  # type: ignore
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(metrics: Metrics, port: int) -> HTTPServer:
+    """Expose `metrics` at `/metrics` on `port` from a background thread."""
+    httpd = HTTPServer(("", port), MetricsRequestHandler)
+    httpd.metrics = metrics  # type: ignore
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    logging.info(f"serving metrics at http://localhost:{port}/metrics")
+    return httpd
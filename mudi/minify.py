@@ -0,0 +1,242 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .models.minify import MinifySettings
+
+# bump when a minifier changes so stale cache entries are ignored
+MINIFY_VERSION = "2"
+# rendered pages change with most edits and are cheap to minify, so caching them
+# would cost a hash and an extra write per page while only growing the cache
+CACHED_SUFFIXES = {".css"}
+# the least recently used entries beyond this are evicted after each build
+MAX_CACHE_ENTRIES = 1024
+
+_HTML_PRESERVED = re.compile(
+    r"(<(pre|textarea|script|style)(?=[\s>/]).*?</\2\s*>)", re.DOTALL | re.IGNORECASE
+)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if|<!|>).*?-->", re.DOTALL)
+# comments, and tags with their attributes, which may contain quoted ">"
+_HTML_MARKUP = re.compile(r"""(<!--.*?-->|<(?:[^>"']|"[^"]*"|'[^']*')*>)""", re.DOTALL)
+_CSS_TOKENS = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*!.*?\*/)|/\*.*?\*/", re.DOTALL
+)
+
+
+def _minify_html_chunk(chunk: str) -> str:
+    parts = _HTML_MARKUP.split(chunk)
+    # split yields (text, markup) pairs; tags are kept as written
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r"\s+", " ", parts[index])
+        if index + 1 < len(parts) and _HTML_COMMENT.fullmatch(parts[index + 1]):
+            parts[index + 1] = ""
+    return "".join(parts)
+
+
+def minify_html(text: str) -> str:
+    """Strip comments, except conditional comments, and collapse whitespace between
+    tags outside of `pre`, `textarea`, `script` and `style` elements. Runs of
+    whitespace become one space, so inline spacing is preserved, and tags and their
+    attribute values are left untouched."""
+    parts = _HTML_PRESERVED.split(text)
+    minified = []
+    # split yields (text, preserved element, tag name) triples
+    for index in range(0, len(parts), 3):
+        minified.append(_minify_html_chunk(parts[index]))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return "".join(minified).strip()
+
+
+def _minify_css_chunk(chunk: str) -> str:
+    chunk = re.sub(r"\s+", " ", chunk)
+    chunk = re.sub(r"\s*([{};,>])\s*", r"\1", chunk)
+    chunk = re.sub(r":\s+", ":", chunk)
+    return chunk.replace(";}", "}")
+
+
+def minify_css(text: str) -> str:
+    """Strip comments, except `/*! ... */` licence comments, and whitespace that
+    has no effect, leaving strings untouched."""
+    minified = []
+    index = 0
+    for match in _CSS_TOKENS.finditer(text):
+        minified.append(_minify_css_chunk(text[index : match.start()]))
+        if match.group(1) is not None:
+            minified.append(match.group(1))
+        index = match.end()
+    minified.append(_minify_css_chunk(text[index:]))
+    return "".join(minified).strip()
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    ".html": minify_html,
+    ".css": minify_css,
+}
+
+
+def _minify_bytes(
+    suffix: str, data: bytes, cache_dir: Optional[Path]
+) -> Tuple[bytes, bool]:
+    cache_filename = None
+    if cache_dir is not None and suffix in CACHED_SUFFIXES:
+        digest = hashlib.sha256(data).hexdigest()
+        cache_filename = cache_dir / f"{MINIFY_VERSION}-{suffix[1:]}-{digest}"
+        try:
+            with open(cache_filename, "rb") as f:
+                minified = f.read()
+            # mark it recently used, see prune_cache
+            os.utime(str(cache_filename))
+            return minified, True
+        except FileNotFoundError:
+            pass
+    minified = MINIFIERS[suffix](data.decode("utf-8")).encode("utf-8")
+    if cache_filename is not None:
+        cache_filename.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filename = cache_filename.with_name(
+            f"{cache_filename.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(tmp_filename, "wb") as f:
+            f.write(minified)
+        os.replace(str(tmp_filename), str(cache_filename))
+    return minified, False
+
+
+def prune_cache(cache_dir: Path, max_entries: int = MAX_CACHE_ENTRIES) -> int:
+    """Delete cache entries from older minifier versions or for outputs that are no
+    longer cached, and the least recently used entries beyond `max_entries`.
+
+    Returns:
+        int: The number of entries deleted.
+
+    """
+    if not cache_dir.is_dir():
+        return 0
+    current = []
+    stale = []
+    for entry in cache_dir.iterdir():
+        if entry.name.endswith(".tmp"):
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except FileNotFoundError:
+            # evicted by a concurrent build
+            continue
+        version, _, rest = entry.name.partition("-")
+        suffix = "." + rest.partition("-")[0]
+        if version == MINIFY_VERSION and suffix in CACHED_SUFFIXES:
+            current.append((mtime, entry))
+        else:
+            stale.append(entry)
+    current.sort(reverse=True)
+    stale.extend(entry for _, entry in current[max_entries:])
+    deleted = 0
+    for entry in stale:
+        try:
+            entry.unlink()
+            deleted += 1
+        except FileNotFoundError:
+            pass
+    return deleted
+
+
+def minify_file(
+    input_filename: Path, output_filename: Path, cache_dir: Optional[Path]
+) -> Tuple[int, int, bool]:
+    """Minify `input_filename` into `output_filename`. Module level so it can run in
+    a process pool.
+
+    Returns:
+        Tuple[int, int, bool]: The input size, output size, and whether the result
+            came from the cache.
+
+    """
+    with open(input_filename, "rb") as f:
+        data = f.read()
+    minified, cached = _minify_bytes(input_filename.suffix, data, cache_dir)
+    output_filename.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_filename, "wb") as f:
+        f.write(minified)
+    return len(data), len(minified), cached
+
+
+class Minifier:
+    def __init__(self, settings: MinifySettings, cache_dir: Optional[Path] = None):
+        """Minifies rendered pages and CSS assets. CSS results are cached on disk by
+        a hash of their input so unchanged files are never minified twice, and the
+        cache is kept to `MAX_CACHE_ENTRIES` by `prune_cache`.
+
+        Args:
+            settings (`MinifySettings`): Which kinds of output to minify, and how many
+                worker processes to use for assets.
+            cache_dir (`Path`, optional): Where minified results are cached. If `None`,
+                nothing is cached.
+
+        """
+        self.settings = settings
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.files = 0
+        self.cached = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def handles(self, filename: Path) -> bool:
+        return {
+            ".html": self.settings.html,
+            ".css": self.settings.css,
+        }.get(filename.suffix, False)
+
+    def _record(self, bytes_in: int, bytes_out: int, cached: bool):
+        with self._lock:
+            self.files += 1
+            self.cached += cached
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def minify_bytes(self, suffix: str, data: bytes) -> bytes:
+        minified, cached = _minify_bytes(suffix, data, self.cache_dir)
+        self._record(len(data), len(minified), cached)
+        return minified
+
+    def minify_html(self, text: str) -> str:
+        return self.minify_bytes(".html", text.encode("utf-8")).decode("utf-8")
+
+    def minify_file(self, input_filename: Path, output_filename: Path):
+        self._record(*minify_file(input_filename, output_filename, self.cache_dir))
+
+    def minify_files(self, filenames: Iterable[Tuple[Path, Path]]):
+        """Minify `(input_filename, output_filename)` pairs across a process pool."""
+        pairs: List[Tuple[Path, Path]] = list(filenames)
+        if len(pairs) < 2 or self.settings.workers == 1:
+            for input_filename, output_filename in pairs:
+                self.minify_file(input_filename, output_filename)
+            return
+        with ProcessPoolExecutor(max_workers=self.settings.workers) as executor:
+            futures = [
+                executor.submit(
+                    minify_file, input_filename, output_filename, self.cache_dir
+                )
+                for input_filename, output_filename in pairs
+            ]
+            for future in futures:
+                self._record(*future.result())
+
+    def prune_cache(self):
+        if self.cache_dir is not None:
+            deleted = prune_cache(self.cache_dir)
+            if deleted:
+                logging.info(f"evicted {deleted} minify cache entries")
+
+    def stats(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        percent = round(100 * saved / self.bytes_in, 1) if self.bytes_in else 0.0
+        return (
+            f"minified {self.files} files ({self.cached} cached), "
+            f"saved {saved} bytes ({percent}%)"
+        )
@@ -1,14 +1,20 @@
 from .collection import CollectionSettings
 from .feeds import FeedSettings, Feeds
+from .fingerprint import FingerprintSettings
 from .markdown import MarkdownSettings
+from .minify import MinifySettings
 from .sass import SassSettings
 from .site import SiteSettings
+from .taxonomy import TaxonomySettings
 
 __all__ = [
     "CollectionSettings",
     "FeedSettings",
     "Feeds",
+    "FingerprintSettings",
     "MarkdownSettings",
+    "MinifySettings",
     "SassSettings",
     "SiteSettings",
+    "TaxonomySettings",
 ]
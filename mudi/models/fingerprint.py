@@ -0,0 +1,13 @@
+from pathlib import Path
+from pydantic import BaseModel
+from typing import List
+
+# stylesheets, scripts and fonts are only ever linked from templates via asset(),
+# unlike images, favicons and files such as robots.txt which need stable URLs
+DEFAULT_INCLUDE = ["*.css", "*.js", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+
+
+class FingerprintSettings(BaseModel):
+    manifest: Path = Path("assets.json")
+    include: List[str] = DEFAULT_INCLUDE
+    exclude: List[str] = []
@@ -12,6 +12,7 @@ class MarkdownSettings(BaseModel):
     codehilite_options: Dict[str, Any] = Field(
         {"css_class": "highlight", "guess_lang": False}
     )
+    cache_codehilite: bool = True
 
     enable_fenced_code: bool = True
 
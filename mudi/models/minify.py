@@ -0,0 +1,15 @@
+from pydantic import BaseModel, validator
+from typing import Optional
+
+
+class MinifySettings(BaseModel):
+    html: bool = True
+    css: bool = True
+    workers: Optional[int] = None
+
+    @validator("workers")
+    def valid_workers(cls, v):
+        if v is None or v > 0:
+            return v
+        else:
+            raise ValueError("workers must be integer greater than 0")
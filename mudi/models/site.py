@@ -2,7 +2,9 @@ from pathlib import Path
 from pydantic import AnyHttpUrl, BaseModel
 from typing import Optional
 
+from .fingerprint import FingerprintSettings
 from .markdown import MarkdownSettings
+from .minify import MinifySettings
 from .sass import SassSettings
 
 
@@ -15,3 +17,6 @@ class SiteSettings(BaseModel):
     absolute_link: Optional[AnyHttpUrl] = None
     sass: Optional[SassSettings] = None
     markdown: MarkdownSettings = MarkdownSettings()
+    minify: Optional[MinifySettings] = None
+    fingerprint: Optional[FingerprintSettings] = None
+    cache_dir: Optional[Path] = Path(".mudi_cache")
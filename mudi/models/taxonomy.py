@@ -0,0 +1,9 @@
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Optional
+
+
+class TaxonomySettings(BaseModel):
+    key: str
+    template: Optional[str] = None
+    output_path: Optional[Path] = None
@@ -2,7 +2,13 @@ from pathlib import Path
 import toml
 from typing import Dict, Optional
 
-from .models import CollectionSettings, FeedSettings, Feeds, SiteSettings
+from .models import (
+    CollectionSettings,
+    FeedSettings,
+    Feeds,
+    SiteSettings,
+    TaxonomySettings,
+)
 
 
 class MudiSettings:
@@ -22,6 +28,11 @@ class MudiSettings:
         collection_settings_dict = settings_dict.pop("collections", {})
         for name, collection_settings in collection_settings_dict.items():
             self.collection_settings[name] = CollectionSettings(**collection_settings)
+        self.taxonomy_settings: Dict[str, TaxonomySettings] = {}
+        taxonomy_settings_dict = settings_dict.pop("taxonomies", {})
+        for key, taxonomy_settings in taxonomy_settings_dict.items():
+            taxonomy_settings.setdefault("key", key)
+            self.taxonomy_settings[key] = TaxonomySettings(**taxonomy_settings)
         self.feeds = Feeds(feeds=settings_dict.pop("feed", []))
         self.site_ctx = settings_dict.pop("ctx", {})
         self.site_settings = SiteSettings(**settings_dict)
@@ -9,6 +9,7 @@ class Page:
         content: Optional[str] = None,
         metadata: Optional[dict] = None,
         content_format: str = "md",
+        source: Optional[Path] = None,
     ):
         """An object containing data needed to render a single page.
 
@@ -21,22 +22,31 @@ class Page:
                 certain reserved names will be saved, including `template`, dictating the
                 Jinja template, and the `ctx` dictionary which can store arbitrary variables
                 accessible to the template engine.
+            content_format (`str`): Either `"md"` or `"html"`. Defaults to `"md"`.
+            source (`Path`, optional): The file this page was loaded from. If given
+                without `content`, the page body is left unloaded until it's first
+                read.
 
         Attributes:
             name (`str`): An identifier that is unique at the site level which also dictates
                 the location of the output file (minus the extension).
             content (`str`): A variable which is passed to the page's template under the
-                name `content`.
+                name `content`. Read from `source` on first access if not loaded.
             template (`str`, optional): The name of the Jinja template used to render this
-                page. Loaded from `metadata`. If `None`, the `Site`'s default template 
+                page. Loaded from `metadata`. If `None`, the `Site`'s default template
                 will be used.
             collections (`List[str]`): A list of collections that this page belongs to.
             ctx (`Dict[str,Any]`): A namespace of variables accessible to the template
                 engine as `page.ctx`.
+            content_loaded (`bool`): Whether the page body is held in memory, which is
+                `False` for pages whose body has not yet been read from `source`.
 
         """
         self.name = name
-        self.content = "" if content is None else content
+        self.source = source
+        self._content: Optional[str] = (
+            "" if content is None and source is None else content
+        )
         self.template: Optional[str]
         self.content_format = content_format
         self.has_jinja: bool
@@ -56,6 +66,38 @@ class Page:
         self.next: Optional[Page]
         self.previous: Optional[Page]
 
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self.load_content()
+        assert self._content is not None
+        return self._content
+
+    @content.setter
+    def content(self, content: str):
+        self._content = content
+
+    @property
+    def content_loaded(self) -> bool:
+        return self._content is not None
+
+    def load_content(self):
+        """Read the page body from `source`, if it isn't already in memory."""
+        # imported here since loaders builds pages
+        from .loaders import load_html_file, load_md_file
+
+        if self._content is None and self.source is not None:
+            if self.content_format == "md":
+                self._content = load_md_file(self.source)[0]
+            else:
+                self._content = load_html_file(self.source)[0]
+
+    def release_content(self):
+        """Drop the page body from memory. It's read from `source` again on the next
+        access, so pages without a `source` keep theirs."""
+        if self.source is not None:
+            self._content = None
+
     def get(self, key: str, default: Any = None) -> Any:
         """Fetch a page attribute, first trying the page class attributes, then page ctx,
         and lastly resorting to a default.
@@ -0,0 +1,154 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .page import Page
+    from .site import Site
+
+# sentinel marking the end of a stage's input
+_DONE = None
+
+
+async def _loaded(page: "Page", read: Optional[asyncio.Future]) -> "Page":
+    if read is not None:
+        await read
+    return page
+
+
+class BuildPipeline:
+    def __init__(
+        self,
+        site: "Site",
+        page_names: List[str],
+        files: List[Path],
+        compile_sass: bool = True,
+        queue_size: int = 32,
+        io_workers: int = 4,
+    ):
+        """Builds a site as a chain of stages connected by bounded queues, so that
+        blocking disk I/O overlaps with rendering.
+
+        Pages flow through load → inner Jinja and Markdown → template render → write.
+        The load stage prefetches the bodies of pages created without them, as a
+        site built with `lazy_content` does, on the thread pool ahead of rendering.
+        A page read before its turn, e.g. by a template listing a collection, loads
+        its body on access instead.
+        Rendering runs on the event loop thread, since the Markdown renderer and
+        Jinja environment are shared, while writes, Sass compilation and static file
+        copies run on a thread pool. A full queue blocks the stage feeding it, which
+        keeps the number of rendered pages held in memory bounded.
+
+        Args:
+            site (`Site`): A fully initialized site to build.
+            page_names (`List[str]`): The names of the pages to render.
+            files (`List[Path]`): The static files to copy, relative to `content_dir`.
+            compile_sass (`bool`): Whether to compile the site's Sass.
+            queue_size (`int`): The capacity of each queue between stages.
+            io_workers (`int`): The number of threads performing disk I/O, which is
+                also the maximum number of in-flight writes and copies.
+
+        """
+        self.site = site
+        self.page_names = page_names
+        self.files = files
+        self.compile_sass = compile_sass
+        self.queue_size = queue_size
+        self.io_workers = io_workers
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._run(loop))
+        finally:
+            loop.close()
+
+    async def _run(self, loop: asyncio.AbstractEventLoop):
+        loaded: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        rendered: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        templated: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        io_slots = asyncio.Semaphore(self.io_workers)
+        in_flight: Set[asyncio.Future] = set()
+
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+
+            async def submit(function: Callable, *args: Any):
+                # wait for a free slot so pending writes can't pile up unbounded
+                await io_slots.acquire()
+                future = loop.run_in_executor(executor, function, *args)
+                future.add_done_callback(lambda _: io_slots.release())
+                in_flight.add(future)
+
+            async def load():
+                # read up to io_workers bodies ahead, handing pages on in order
+                reads: Deque[Tuple["Page", Optional[asyncio.Future]]] = deque()
+                for name in self.page_names:
+                    page = self.site.pages[name]
+                    read = None
+                    if not page.content_loaded:
+                        read = loop.run_in_executor(executor, page.load_content)
+                    reads.append((page, read))
+                    if len(reads) >= self.io_workers:
+                        await loaded.put(await _loaded(*reads.popleft()))
+                while reads:
+                    await loaded.put(await _loaded(*reads.popleft()))
+                await loaded.put(_DONE)
+
+            async def render_content():
+                while True:
+                    page = await loaded.get()
+                    if page is _DONE:
+                        break
+                    await rendered.put((page, self.site.render_content(page)))
+                    # yield so the downstream stages can start on this page
+                    await asyncio.sleep(0)
+                await rendered.put(_DONE)
+
+            async def render_template():
+                while True:
+                    item = await rendered.get()
+                    if item is _DONE:
+                        break
+                    page, content = item
+                    await templated.put(
+                        (page, self.site.render_template(page, content))
+                    )
+                    await asyncio.sleep(0)
+                await templated.put(_DONE)
+
+            async def write():
+                while True:
+                    item = await templated.get()
+                    if item is _DONE:
+                        break
+                    await submit(self.site.write_page, *item)
+
+            async def copy():
+                for filename in self.files:
+                    await submit(self.site.copy_file, filename)
+
+            logging.info("building with pipeline...")
+            if self.compile_sass:
+                await submit(self.site.compile_sass)
+            stages = [
+                loop.create_task(stage)
+                for stage in [
+                    load(),
+                    render_content(),
+                    render_template(),
+                    write(),
+                    copy(),
+                ]
+            ]
+            try:
+                await asyncio.gather(*stages)
+                await asyncio.gather(*in_flight)
+            finally:
+                # a failed stage leaves the others blocked on their queues
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, *in_flight, return_exceptions=True)
+            logging.info("rendered html, compiled sass and copied files")
@@ -0,0 +1,63 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+# kept next to the outputs so it travels with them, e.g. to a merged shard build;
+# deploy tooling should exclude it
+OUTPUTS_NAME = ".mudi_outputs.json"
+
+
+def read_outputs(output_dir: Path) -> Optional[Set[str]]:
+    """The outputs recorded by the last build into `output_dir`, as paths relative
+    to it, or `None` if none were recorded."""
+    try:
+        with open(output_dir / OUTPUTS_NAME) as f:
+            return set(json.load(f)["outputs"])
+    except FileNotFoundError:
+        return None
+
+
+def write_outputs(output_dir: Path, outputs: Iterable[str]):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tmp_filename = output_dir / f"{OUTPUTS_NAME}.{os.getpid()}.tmp"
+    with open(tmp_filename, "w") as f:
+        json.dump({"outputs": sorted(set(outputs))}, f, indent=2)
+    os.replace(str(tmp_filename), str(output_dir / OUTPUTS_NAME))
+
+
+def _remove_empty_parents(filename: Path, output_dir: Path):
+    for parent in filename.parents:
+        if parent == output_dir or output_dir not in parent.parents:
+            return
+        try:
+            parent.rmdir()
+        except OSError:
+            # not empty
+            return
+
+
+def prune_outputs(
+    output_dir: Path, stale: Iterable[str], dry_run: bool = False
+) -> List[str]:
+    """Delete the `stale` outputs from `output_dir`, and any directories left empty.
+    Paths that don't exist or would resolve outside `output_dir` are skipped.
+
+    Returns:
+        List[str]: The outputs that were, or with `dry_run` would be, deleted.
+
+    """
+    root = output_dir.resolve()
+    pruned = []
+    for output in sorted(stale):
+        filename = (output_dir / output).resolve()
+        if root not in filename.parents or not filename.is_file():
+            continue
+        pruned.append(output)
+        if dry_run:
+            continue
+        filename.unlink()
+        _remove_empty_parents(filename, root)
+        logging.info(f"pruned {output}")
+    return pruned
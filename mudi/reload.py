@@ -0,0 +1,55 @@
+import json
+import queue
+import threading
+from typing import Iterable, List
+
+EVENTS_PATH = "/__mudi__/events"
+
+RELOAD_SCRIPT = """<script>
+(function () {
+  var source = new EventSource("%s");
+  source.onmessage = function (event) {
+    var changed = JSON.parse(event.data);
+    var current = decodeURIComponent(window.location.pathname);
+    if (current.endsWith("/")) {
+      current += "index.html";
+    } else if (current.lastIndexOf(".") <= current.lastIndexOf("/")) {
+      current += ".html";
+    }
+    for (var i = 0; i < changed.length; i++) {
+      if (changed[i] === current || !changed[i].endsWith(".html")) {
+        window.location.reload();
+        return;
+      }
+    }
+  };
+})();
+</script>
+""" % (
+    EVENTS_PATH
+)
+
+
+class ReloadBroker:
+    def __init__(self):
+        """Fans out lists of rewritten output paths from the dispatcher to every
+        connected live reload client."""
+        self._lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+
+    def subscribe(self) -> queue.Queue:
+        subscriber: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, url_paths: Iterable[str]):
+        message = json.dumps(sorted(set(url_paths)))
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.put(message)
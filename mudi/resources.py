@@ -0,0 +1,56 @@
+import json
+from jinja2 import BytecodeCache
+from typing import Dict, Optional
+
+from .highlight import HighlightCache
+from .markdown import MarkdownRenderer
+from .models.markdown import MarkdownSettings
+
+
+class MemoryBytecodeCache(BytecodeCache):
+    """Keeps compiled Jinja templates in memory, so environments sharing it only
+    compile each template source once."""
+
+    def __init__(self):
+        self._bytecode: Dict[str, bytes] = {}
+
+    def load_bytecode(self, bucket):
+        bytecode = self._bytecode.get(bucket.key)
+        if bytecode is not None:
+            bucket.bytecode_from_string(bytecode)
+
+    def dump_bytecode(self, bucket):
+        self._bytecode[bucket.key] = bucket.bytecode_to_string()
+
+    def clear(self):
+        self._bytecode.clear()
+
+
+class BuildResources:
+    def __init__(self, highlight_cache: Optional[HighlightCache] = None):
+        """Expensive, reusable build machinery which can be shared by several sites
+        built in the same process.
+
+        Args:
+            highlight_cache (`HighlightCache`, optional): The cache of highlighted code
+                blocks. Defaults to a new in-memory cache.
+
+        Attributes:
+            bytecode_cache (`MemoryBytecodeCache`): Compiled Jinja templates, keyed by
+                template name, filename and source checksum.
+
+        """
+        self.highlight_cache = (
+            highlight_cache if highlight_cache is not None else HighlightCache()
+        )
+        self.bytecode_cache = MemoryBytecodeCache()
+        self._renderers: Dict[str, MarkdownRenderer] = {}
+
+    def markdown_renderer(self, settings: MarkdownSettings) -> MarkdownRenderer:
+        """Return a renderer for `settings`, reusing one built for equal settings."""
+        key = json.dumps(settings.dict(), sort_keys=True, default=str)
+        renderer = self._renderers.get(key)
+        if renderer is None:
+            renderer = MarkdownRenderer(settings, self.highlight_cache)
+            self._renderers[key] = renderer
+        return renderer
@@ -0,0 +1,59 @@
+from fnmatch import fnmatchcase
+from typing import Iterable, List, Optional
+
+
+class PageSelector:
+    def __init__(
+        self,
+        paths: Optional[List[str]] = None,
+        collections: Optional[List[str]] = None,
+        templates: Optional[List[str]] = None,
+    ):
+        """Picks the pages a partial build renders. A page is selected if it matches
+        any of the selectors.
+
+        Args:
+            paths (`List[str]`, optional): Globs matched against source paths relative
+                to `content_dir`, e.g. `blog/*.md`. `*` also matches `/`, and a bare
+                directory such as `blog` selects everything under it.
+            collections (`List[str]`, optional): Collection names.
+            templates (`List[str]`, optional): Template names, matched against each
+                page's template or the site's default template.
+
+        """
+        self.paths = [path.strip("/") for path in paths or []]
+        self.collections = set(collections or [])
+        self.templates = set(templates or [])
+
+    @classmethod
+    def from_strings(cls, selectors: Iterable[str]) -> "PageSelector":
+        """Parse selectors given as `collection:<name>`, `template:<name>` or a path
+        glob."""
+        selector = cls()
+        for spec in selectors:
+            prefix, _, value = spec.partition(":")
+            if prefix == "collection" and value:
+                selector.collections.add(value)
+            elif prefix == "template" and value:
+                selector.templates.add(value)
+            else:
+                selector.paths.append(spec.strip("/"))
+        return selector
+
+    def matches_path(self, path: str) -> bool:
+        return any(
+            fnmatchcase(path, pattern) or path.startswith(pattern + "/")
+            for pattern in self.paths
+        )
+
+    def matches(
+        self, path: Optional[str], collections: Iterable[str], template: str
+    ) -> bool:
+        """Whether a page is selected, given its source path relative to
+        `content_dir` (`None` for generated pages), its collections and the template
+        it renders with."""
+        if path is not None and self.matches_path(path):
+            return True
+        if template in self.templates:
+            return True
+        return not self.collections.isdisjoint(collections)
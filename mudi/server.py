@@ -4,29 +4,56 @@ http://louistiao.me/posts/python-simplehttpserver-recipe-serve-specific-director
 """
 
 import argparse
+from http import HTTPStatus
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 import logging
 from pathlib import Path
 import posixpath
 import os
+import queue
+from socketserver import ThreadingMixIn
 import sys
 import threading
-from typing import Optional
-from urllib.parse import unquote
+import time
+from typing import Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .fingerprint import is_fingerprinted
+from .metrics import Metrics
+from .reload import EVENTS_PATH, RELOAD_SCRIPT, ReloadBroker
 
 
 class DirectoryServer(HTTPServer):
-    def __init__(self, base_path, *args, **kwargs):
+    def __init__(self, base_path, *args, metrics: Optional[Metrics] = None, **kwargs):
+        self.base_path = base_path
+        self.metrics = metrics
         super().__init__(*args, **kwargs)
-        self.RequestHandlerClass.base_path = base_path
 
 
 class DirectoryRequestHandler(SimpleHTTPRequestHandler):
+    # long-lived requests that would skew latency metrics
+    untimed_paths: Tuple[str, ...] = ()
+
+    def handle_one_request(self):
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is None:
+            super().handle_one_request()
+            return
+        tic = time.perf_counter()
+        self.status_code = None
+        super().handle_one_request()
+        if self.status_code is not None and (
+            urlsplit(getattr(self, "path", "")).path not in self.untimed_paths
+        ):
+            metrics.request_seconds.observe(
+                time.perf_counter() - tic, str(self.status_code)
+            )
+
     def translate_path(self, path):
         path = posixpath.normpath(unquote(path))
         words = path.split("/")
         words = filter(None, words)
-        path = self.base_path
+        path = self.server.base_path
         for word in words:
             # for windows
             drive, word = os.path.splitdrive(word)
@@ -36,16 +63,87 @@ class DirectoryRequestHandler(SimpleHTTPRequestHandler):
             path = os.path.join(path, word)
         return path
 
+    def send_response(self, code, message=None):
+        self.status_code = int(code)
+        super().send_response(code, message)
+        # fingerprinted names change with their content, so they never go stale
+        if code == HTTPStatus.OK and is_fingerprinted(urlsplit(self.path).path):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+
+
+class ThreadingDirectoryServer(ThreadingMixIn, DirectoryServer):
+    daemon_threads = True
+
+
+class LiveReloadServer(ThreadingDirectoryServer):
+    def __init__(self, base_path, *args, broker: ReloadBroker, **kwargs):
+        self.broker = broker
+        super().__init__(base_path, *args, **kwargs)
+
+
+class LiveReloadRequestHandler(DirectoryRequestHandler):
+    keepalive_interval = 15.0
+    untimed_paths = (EVENTS_PATH,)
+
+    def do_GET(self):
+        url_path = urlsplit(self.path).path
+        if url_path == EVENTS_PATH:
+            self._stream_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and url_path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self._send_html_with_script(path)
+        else:
+            super().do_GET()
+
+    def _send_html_with_script(self, path: str):
+        with open(path, "rb") as f:
+            body = f.read()
+        script = RELOAD_SCRIPT.encode("utf-8")
+        index = body.rfind(b"</body>")
+        if index == -1:
+            body += script
+        else:
+            body = body[:index] + script + body[index:]
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        subscriber = self.server.broker.subscribe()
+        try:
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.keepalive_interval)
+                    self.wfile.write(f"data: {message}\n\n".encode("utf-8"))
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.broker.unsubscribe(subscriber)
+
 
 def serve(
     serve_dir: Path,
     port: int,
     HandlerClass=DirectoryRequestHandler,
     ServerClass=DirectoryServer,
+    **server_kwargs,
 ):
     server_address = ("", port)
 
-    with ServerClass(serve_dir, server_address, HandlerClass) as httpd:
+    with ServerClass(serve_dir, server_address, HandlerClass, **server_kwargs) as httpd:
         socket_address = httpd.socket.getsockname()
         logging.info(
             f"Serving http from {serve_dir} at http://{socket_address[0]}:{socket_address[1]}"
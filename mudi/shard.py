@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+import shutil
+from typing import Dict, Iterable, List, Set
+
+from .exceptions import ShardMergeError
+from .prune import prune_outputs, read_outputs, write_outputs
+
+MANIFEST_NAME = ".mudi_shard.json"
+
+
+class Shard:
+    def __init__(self, index: int, count: int):
+        """One of `count` deterministic slices of a site's pages and files.
+
+        Args:
+            index (`int`): The 1-based index of this shard.
+            count (`int`): The total number of shards.
+
+        """
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def from_string(cls, spec: str) -> "Shard":
+        """Parse a shard given as `"i/N"`, e.g. `"2/4"`."""
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"shard must look like i/N, got {spec!r}")
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def includes(self, key: str) -> bool:
+        """Whether the page name or file path `key` belongs to this shard. Uses a
+        stable hash so every process agrees regardless of `PYTHONHASHSEED`."""
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index - 1
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this shard builds the outputs not tied to a single page or file,
+        such as compiled Sass and taxonomy term pages."""
+        return self.index == 1
+
+
+def site_digest(page_names: Iterable[str], files: Iterable[str]) -> str:
+    digest = hashlib.sha1()
+    for name in sorted(page_names):
+        digest.update(b"page\0" + name.encode("utf-8") + b"\0")
+    for name in sorted(files):
+        digest.update(b"file\0" + name.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def write_manifest(
+    output_dir: Path,
+    shard: Shard,
+    pages: List[str],
+    files: List[str],
+    outputs: List[str],
+    digest: str,
+):
+    manifest = {
+        "index": shard.index,
+        "count": shard.count,
+        "site_digest": digest,
+        "pages": sorted(pages),
+        "files": sorted(files),
+        "outputs": sorted(set(outputs)),
+    }
+    with open(output_dir / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+    logging.info(f"wrote manifest for shard {shard} to {output_dir / MANIFEST_NAME}")
+
+
+def _load_manifest(shard_dir: Path) -> dict:
+    try:
+        with open(shard_dir / MANIFEST_NAME, "r") as f:
+            return json.load(f)
+    except OSError:
+        raise ShardMergeError(f"{shard_dir} has no {MANIFEST_NAME}")
+
+
+def _claim(owners: Dict[str, int], items: Iterable[str], index: int, kind: str):
+    for item in items:
+        if item in owners:
+            raise ShardMergeError(
+                f"{kind} {item} is in both shard {owners[item]} and shard {index}"
+            )
+        owners[item] = index
+
+
+def merge_shards(shard_dirs: List[Path], output_dir: Path):
+    """Combine the output directories of a sharded build into `output_dir`, checking
+    that every shard is present exactly once and that no page or file is missing or
+    built twice. Outputs recorded by an earlier build into `output_dir` that none of
+    the shards produced are pruned.
+
+    Raises:
+        ShardMergeError: If the shards are incomplete, inconsistent or overlapping.
+
+    """
+    manifests = [(shard_dir, _load_manifest(shard_dir)) for shard_dir in shard_dirs]
+    if not manifests:
+        raise ShardMergeError("no shards given")
+
+    count = manifests[0][1]["count"]
+    digest = manifests[0][1]["site_digest"]
+    indices: Set[int] = set()
+    for shard_dir, manifest in manifests:
+        if manifest["count"] != count or manifest["site_digest"] != digest:
+            raise ShardMergeError(f"{shard_dir} was built from a different site")
+        if manifest["index"] in indices:
+            raise ShardMergeError(f"shard {manifest['index']}/{count} given twice")
+        indices.add(manifest["index"])
+    missing_shards = set(range(1, count + 1)) - indices
+    if missing_shards:
+        raise ShardMergeError(f"missing shards {sorted(missing_shards)} of {count}")
+
+    page_owners: Dict[str, int] = {}
+    file_owners: Dict[str, int] = {}
+    output_owners: Dict[str, int] = {}
+    for shard_dir, manifest in manifests:
+        _claim(page_owners, manifest["pages"], manifest["index"], "page")
+        _claim(file_owners, manifest["files"], manifest["index"], "file")
+        _claim(output_owners, manifest["outputs"], manifest["index"], "output")
+    if site_digest(page_owners, file_owners) != digest:
+        raise ShardMergeError("shards do not cover every page and file of the site")
+
+    for shard_dir, manifest in manifests:
+        for output in manifest["outputs"]:
+            source = shard_dir / output
+            if not source.is_file():
+                raise ShardMergeError(f"{source} is listed in its manifest but missing")
+            destination = output_dir / output
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, destination)
+    previous = read_outputs(output_dir)
+    if previous is not None:
+        prune_outputs(output_dir, previous - set(output_owners))
+    write_outputs(output_dir, output_owners)
+    logging.info(
+        f"merged {count} shards ({len(page_owners)} pages, {len(file_owners)} files) "
+        f"into {output_dir}"
+    )
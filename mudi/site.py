@@ -5,22 +5,36 @@ import sass
 import shutil
 import time
 import toml
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
 
+from .archive import ArchiveWriter
 from .collection import Collection
+from .cache import FileCache
 from .exceptions import NotInitializedError
-from .loaders import load_html_file, load_md_file
-from .markdown import MarkdownRenderer
+from .fingerprint import Fingerprinter
+from .highlight import HighlightCache
+from .links import BrokenLink, LinkChecker
+from .loaders import load_html_file, load_md_file, load_md_metadata
+from .memo import ContextCache
+from .metrics import Metrics
+from .minify import Minifier
 from .models import (
     CollectionSettings,
     Feeds,
     MarkdownSettings,
     SassSettings,
     SiteSettings,
+    TaxonomySettings,
 )
 from .mudi_settings import MudiSettings
 from .page import Page
-from .utils import delete_directory_contents, rel_name, tictoc
+from .pipeline import BuildPipeline
+from .prune import prune_outputs, read_outputs, write_outputs
+from .resources import BuildResources
+from .selection import PageSelector
+from .shard import Shard, site_digest, write_manifest
+from .taxonomy import Taxonomy
+from .utils import delete_directory_contents, peak_rss_mb, rel_name, tictoc
 
 
 class Site:
@@ -30,22 +44,56 @@ class Site:
         ctx: Optional[dict] = None,
         collection_settings: Optional[Dict[str, CollectionSettings]] = None,
         feeds: Optional[Feeds] = None,
+        taxonomy_settings: Optional[Dict[str, TaxonomySettings]] = None,
         fully_initialize: bool = True,
+        low_memory: bool = False,
+        resources: Optional[BuildResources] = None,
+        selector: Optional[PageSelector] = None,
+        lazy_content: bool = False,
     ):
 
         self.settings = site_settings
+        self.low_memory = low_memory
+        self.selector = selector
+        # whether page bodies are read on first access rather than while parsing;
+        # with low_memory they're also dropped once written, so a template reading
+        # another page's body reads it from disk again
+        self.lazy_content = lazy_content or low_memory or selector is not None
         self.collection_settings = (
             collection_settings if collection_settings is not None else {}
         )
         self.ctx = ctx if ctx is not None else {}
         self.feeds = feeds if feeds is not None else Feeds()
+        self.taxonomy_settings = (
+            taxonomy_settings if taxonomy_settings is not None else {}
+        )
 
         self.files: List[Path] = []
         self.files_to_copy: List[Path] = []
         self.pages: Dict[str, Page] = {}
         self.collections: Dict[str, Collection] = dict()
+        self.taxonomies: Dict[str, Taxonomy] = dict()
+        self.written_outputs: List[Path] = []
+        self.context_cache = ContextCache(self.pages)
+        self.pages_rendered = 0
+        self.metrics: Optional[Metrics] = None
 
         self.env: Environment
+        self.resources = (
+            resources
+            if resources is not None
+            else BuildResources(HighlightCache(self.cache_file("highlight.json")))
+        )
+        self.highlight_cache = self.resources.highlight_cache
+        self.minifier: Optional[Minifier] = None
+        if self.settings.minify is not None:
+            self.minifier = Minifier(self.settings.minify, self.cache_file("minify"))
+        self.fingerprinter: Optional[Fingerprinter] = None
+        if self.settings.fingerprint is not None:
+            self.fingerprinter = Fingerprinter(
+                self.settings.fingerprint, self.cache_file("fingerprints.json")
+            )
+            self.fingerprinter.load_previous_manifest(self.output_dir)
 
         self.fully_initialized = False
         if fully_initialize:
@@ -62,9 +110,10 @@ class Site:
             self._get_jinja_env()
 
             self._build_collections()
+            self._build_taxonomies()
             self._parse_tree()
 
-            self.md = MarkdownRenderer(self.settings.markdown)
+            self.md = self.resources.markdown_renderer(self.settings.markdown)
 
             self.fully_initialized = True
 
@@ -75,6 +124,7 @@ class Site:
             loader=FileSystemLoader(str(self.template_dir)),
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=self.resources.bytecode_cache,
         )
         self.env.globals = {
             "site": self,
@@ -82,17 +132,31 @@ class Site:
             "feeds": self.feeds,
             "pages": self.pages,
         }
+        self.env.globals["asset"] = self.asset
+        self.env.filters.update(self.context_cache.filters())
+        self.env.filters["asset"] = self.asset
 
     @classmethod
     def from_mudi_settings(
-        cls, mudi_settings: MudiSettings, fully_initialize: bool = True,
+        cls,
+        mudi_settings: MudiSettings,
+        fully_initialize: bool = True,
+        low_memory: bool = False,
+        resources: Optional[BuildResources] = None,
+        selector: Optional[PageSelector] = None,
+        lazy_content: bool = False,
     ):
         return cls(
             site_settings=mudi_settings.site_settings,
             ctx=mudi_settings.site_ctx,
             collection_settings=mudi_settings.collection_settings,
             feeds=mudi_settings.feeds,
+            taxonomy_settings=mudi_settings.taxonomy_settings,
             fully_initialize=fully_initialize,
+            low_memory=low_memory,
+            resources=resources,
+            selector=selector,
+            lazy_content=lazy_content,
         )
 
     @classmethod
@@ -101,10 +165,21 @@ class Site:
         settings_file: Path,
         output_dir: Optional[Path] = None,
         fully_initialize: bool = True,
+        low_memory: bool = False,
+        resources: Optional[BuildResources] = None,
+        selector: Optional[PageSelector] = None,
+        lazy_content: bool = False,
     ):
         mudi_settings = MudiSettings(settings_file, output_dir)
         logging.info(f"loaded settings from {settings_file}")
-        return cls.from_mudi_settings(mudi_settings, fully_initialize)
+        return cls.from_mudi_settings(
+            mudi_settings,
+            fully_initialize,
+            low_memory,
+            resources,
+            selector,
+            lazy_content,
+        )
 
     @property
     def input_dir(self) -> Path:
@@ -136,6 +211,27 @@ class Site:
         else:
             return None
 
+    @property
+    def cache_dir(self) -> Optional[Path]:
+        return self.settings.cache_dir
+
+    def cache_file(self, name: str) -> Optional[Path]:
+        if self.cache_dir is not None:
+            return self.cache_dir / name
+        else:
+            return None
+
+    def save_caches(self):
+        self.highlight_cache.save()
+        if self.fingerprinter is not None:
+            self.fingerprinter.hashes.save()
+        if self.highlight_cache.hits or self.highlight_cache.misses:
+            logging.info(f"highlight cache: {self.highlight_cache.stats()}")
+        if self.minifier is not None:
+            self.minifier.prune_cache()
+            if self.minifier.files:
+                logging.info(self.minifier.stats())
+
     def is_sass_file(self, filename: Path) -> bool:
         if self.settings.sass is None:
             return False
@@ -151,6 +247,10 @@ class Site:
                 collection_settings
             )
 
+    def _build_taxonomies(self):
+        for key, taxonomy_settings in self.taxonomy_settings.items():
+            self.taxonomies[key] = Taxonomy.from_taxonomy_settings(taxonomy_settings)
+
     def _parse_tree(self):
         self.files = [
             filename
@@ -163,16 +263,19 @@ class Site:
                 self.add_page_from_file(filename)
             elif Path(filename).suffix == ".html":
                 # TODO: handle name collisions
-                self.add_page_from_file(page)
+                self.add_page_from_file(filename)
             elif self.is_sass_file(Path(filename)):
                 logging.debug(f"found sass file {filename}")
                 continue
             elif Path(filename).is_file():
                 logging.debug(f"{filename} → files to copy")
-                self.files_to_copy.append(rel_name(filename, self.content_dir))
+                self.files_to_copy.append(filename.relative_to(self.content_dir))
 
     def add_page(self, page: Page):
         self.pages[page.name] = page
+        self.context_cache.clear()
+        for taxonomy in self.taxonomies.values():
+            taxonomy.add(page)
         logging.info(self.collections)
         for collection in page.collections:
             if collection in self.collections:
@@ -187,7 +290,19 @@ class Site:
 
     def add_page_from_file(self, filename: Path):
         name = self._path_to_name(filename)
-        if filename.suffix == ".md":
+        if self.lazy_content:
+            # keep only the front matter resident; the body is read on first access,
+            # so a partial build never reads the bodies of pages nothing uses and a
+            # pipelined build reads them ahead in its load stage
+            content_format = filename.suffix.lstrip(".")
+            metadata = load_md_metadata(filename) if content_format == "md" else {}
+            page = Page(
+                name=name,
+                metadata=metadata,
+                content_format=content_format,
+                source=filename,
+            )
+        elif filename.suffix == ".md":
             content, metadata = load_md_file(filename)
             page = Page(name=name, content=content, metadata=metadata,)
         elif filename.suffix == ".html":
@@ -202,6 +317,9 @@ class Site:
         for collection in page.collections:
             self.collections[collection].remove(page)
         del self.pages[page.name]
+        self.context_cache.clear()
+        for taxonomy in self.taxonomies.values():
+            taxonomy.remove(page)
         self.delete_file(Path(page.name + ".html"))
         self.env.globals["collections"] = self.collections
         self.env.globals["pages"] = self.pages
@@ -215,6 +333,16 @@ class Site:
         if isinstance(page, str):
             page = self.pages[page]
 
+        if self.metrics is not None:
+            tic = time.perf_counter()
+        content = self.render_content(page)
+        output = self.render_template(page, content, stream=self.low_memory)
+        self.write_page(page, output)
+        self.pages_rendered += 1
+        if self.metrics is not None:
+            self.metrics.render_seconds.observe(time.perf_counter() - tic)
+
+    def render_content(self, page: Page) -> str:
         if page.has_jinja:
             logging.debug(f"{page.name}: rendering inner jinja")
             content_template = self.env.from_string(page.content)
@@ -227,49 +355,241 @@ class Site:
             if page.markdown is not None:
                 markdown_settings = self.settings.markdown.dict()
                 markdown_settings.update(page.markdown)
-                md = MarkdownRenderer(MarkdownSettings(**markdown_settings))
+                md = self.resources.markdown_renderer(
+                    MarkdownSettings(**markdown_settings)
+                )
             else:
                 md = self.md
             content = md.reset().convert(content).rstrip()
+        return content
 
+    def render_template(
+        self, page: Page, content: str, stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         logging.debug(f"{page.name}: rendering jinja")
         template = self.env.get_template(
             page.template or self.settings.default_template
         )
-        output = template.render(content=content, page=page)
-
-        output_filename = self.settings.output_dir / Path(page.name).with_suffix(
-            ".html"
-        )
+        if stream:
+            return template.generate(content=content, page=page)
+        return template.render(content=content, page=page)
+
+    def page_output_filename(self, page: Page) -> Path:
+        return self.settings.output_dir / Path(page.name).with_suffix(".html")
+
+    def write_page(self, page: Page, output: Union[str, Iterator[str]]):
+        output_filename = self.page_output_filename(page)
+        if self.minifier is not None and self.minifier.handles(output_filename):
+            if not isinstance(output, str):
+                output = "".join(output)
+            output = self.minifier.minify_html(output)
         output_filename.parent.mkdir(parents=True, exist_ok=True)
         with open(output_filename, "w") as f:
-            f.write(output)
+            if isinstance(output, str):
+                f.write(output)
+            else:
+                f.writelines(output)
+        self._record_output(output_filename)
+        if self.low_memory:
+            page.release_content()
         logging.info(f"wrote {page.name} to {output_filename}")
 
-    def render_all_pages(self):
+    def where(self, key: str, term: Any) -> List[Page]:
+        """Look up the pages whose `ctx[key]` is or contains `term`, e.g.
+        `site.where("tags", "python")`. `key` must be a configured taxonomy."""
+        try:
+            taxonomy = self.taxonomies[key]
+        except KeyError:
+            raise KeyError(f"{key} is not a configured taxonomy")
+        return taxonomy.where(term)
+
+    def render_taxonomy_pages(self, changed_only: bool = False):
+        """Render one page per taxonomy term for taxonomies with a template. With
+        `changed_only`, only terms whose membership changed since they were last
+        rendered are re-rendered, and pages for terms that lost all pages are
+        deleted."""
+        for taxonomy in self.taxonomies.values():
+            if taxonomy.template is None:
+                continue
+            changed, removed = taxonomy.changed_terms()
+            terms = changed if changed_only else taxonomy.terms()
+            for term in terms:
+                term_page = taxonomy.term_page(term)
+                if self.is_selected(term_page):
+                    self.render_page(term_page)
+            for term in removed:
+                filename = Path(taxonomy.term_page_name(term) + ".html")
+                if (self.output_dir / filename).is_file():
+                    self.delete_file(filename)
+            taxonomy.mark_rendered(terms + removed)
+
+    def is_selected(self, page: Page) -> bool:
+        """Whether `page` is rendered by a partial build. Always `True` without a
+        selector."""
+        if self.selector is None:
+            return True
+        path = (
+            page.source.relative_to(self.content_dir).as_posix()
+            if page.source is not None
+            else None
+        )
+        return self.selector.matches(
+            path, page.collections, page.template or self.settings.default_template
+        )
+
+    def render_all_pages(self, page_names: Optional[Iterable[str]] = None):
         logging.info("rendering...")
-        for page in self.pages:
+        for page in list(self.pages) if page_names is None else page_names:
             self.render_page(page)
         logging.info("rendered html")
 
+    def asset(self, path: str) -> str:
+        """Resolve the logical path of an asset, relative to the output directory, to
+        its URL. Available to templates as the `asset()` global and filter, e.g.
+        `{{ asset("css/main.css") }}` gives `/css/main.<hash>.css` when fingerprinting
+        is enabled and includes the asset."""
+        logical_path = path.lstrip("/")
+        if self.fingerprinter is None or not self.fingerprints(logical_path):
+            return "/" + logical_path
+        fingerprinted = self.fingerprinter.manifest.get(logical_path)
+        if fingerprinted is None:
+            fingerprinted = self._fingerprint_asset(logical_path)
+        return "/" + fingerprinted
+
+    def fingerprints(self, logical_path: str) -> bool:
+        """Whether the asset at `logical_path`, relative to the output directory, is
+        renamed after its content."""
+        return self.fingerprinter is not None and self.fingerprinter.includes(
+            logical_path
+        )
+
+    def _fingerprint_asset(self, logical_path: str) -> str:
+        assert self.fingerprinter is not None
+        input_filename = self.content_dir / logical_path
+        if input_filename.is_file():
+            digest = self.fingerprinter.hash_file(input_filename)
+            return self.fingerprinter.add(logical_path, digest)
+        source = self._sass_source(logical_path)
+        if source is not None:
+            css = self._compile_sass_file(source)
+            digest = self.fingerprinter.hash_bytes(css.encode("utf-8"))
+            return self.fingerprinter.add(logical_path, digest)
+        return logical_path
+
+    def _sass_logical_path(self, source: Path) -> str:
+        assert self.settings.sass is not None and self.sass_in is not None
+        relative_path = source.relative_to(self.sass_in).with_suffix(".css")
+        return (self.settings.sass.sass_out / relative_path).as_posix()
+
+    def _sass_source(self, logical_path: str) -> Optional[Path]:
+        if self.settings.sass is None or self.sass_in is None:
+            return None
+        try:
+            relative_path = Path(logical_path).relative_to(self.settings.sass.sass_out)
+        except ValueError:
+            return None
+        for suffix in [".scss", ".sass"]:
+            source = self.sass_in / relative_path.with_suffix(suffix)
+            if source.is_file():
+                return source
+        return None
+
+    def _sass_entry_points(self) -> List[Path]:
+        """Sass sources that compile to their own css file, i.e. not partials."""
+        if self.settings.sass is None or self.sass_in is None:
+            return []
+        return [
+            source
+            for source in sorted(self.sass_in.glob("**/*"))
+            if source.suffix in [".scss", ".sass"] and not source.name.startswith("_")
+        ]
+
+    def _compile_sass_file(self, source: Path) -> str:
+        assert self.settings.sass is not None
+        return sass.compile(
+            filename=str(source), output_style=self.settings.sass.output_style
+        )
+
     def compile_sass(self):
         if self.settings.sass is not None:
             logging.info("compiling sass...")
-            sass.compile(
-                dirname=(self.sass_in, self.sass_out),
-                output_style=self.settings.sass.output_style,
-            )
+            if self.fingerprinter is not None:
+                output_filenames = self._compile_sass_fingerprinted()
+            else:
+                sass.compile(
+                    dirname=(self.sass_in, self.sass_out),
+                    output_style=self.settings.sass.output_style,
+                )
+                # only what this build compiled, not css left over in sass_out
+                output_filenames = [
+                    self.output_dir / self._sass_logical_path(source)
+                    for source in self._sass_entry_points()
+                ]
+            for output_filename in output_filenames:
+                if self.minifier is not None and self.minifier.handles(output_filename):
+                    self.minifier.minify_file(output_filename, output_filename)
+                self._record_output(output_filename)
             logging.info("compiled sass")
 
+    def _compile_sass_fingerprinted(self) -> List[Path]:
+        # compile each entry point ourselves, mirroring sass.compile(dirname=...), so
+        # outputs get the same names asset() computed from the compiled css
+        assert self.fingerprinter is not None and self.sass_in is not None
+        output_filenames = []
+        for source in self._sass_entry_points():
+            css = self._compile_sass_file(source).encode("utf-8")
+            logical_path = self._sass_logical_path(source)
+            if self.fingerprints(logical_path):
+                logical_path = self.fingerprinter.add(
+                    logical_path, self.fingerprinter.hash_bytes(css)
+                )
+            output_filename = self.output_dir / logical_path
+            output_filename.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_filename, "wb") as f:
+                f.write(css)
+            output_filenames.append(output_filename)
+        return output_filenames
+
+    def copied_output_name(self, filename: Path) -> Path:
+        """The output path, relative to the output directory, of a file copied from
+        `content_dir`, fingerprinted if enabled and included."""
+        if self.fingerprinter is None or not self.fingerprints(filename.as_posix()):
+            return filename
+        digest = self.fingerprinter.hash_file(self.content_dir / filename)
+        return Path(self.fingerprinter.add(filename.as_posix(), digest))
+
+    def write_asset_manifest(self):
+        if self.fingerprinter is not None:
+            manifest_filename = self.fingerprinter.write_manifest(self.output_dir)
+            self._record_output(manifest_filename)
+            logging.info(f"wrote asset manifest to {manifest_filename}")
+
     def copy_file(self, filename: Path):
         input_filename = self.content_dir / filename
-        output_filename = self.output_dir / filename
-        output_filename.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(input_filename, output_filename)
+        output_filename = self.output_dir / self.copied_output_name(filename)
+        if self.minifier is not None and self.minifier.handles(filename):
+            self.minifier.minify_file(input_filename, output_filename)
+        else:
+            output_filename.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(input_filename, output_filename)
+        self._record_output(output_filename)
 
-    def copy_all_files(self):
+    def copy_all_files(self, files: Optional[Iterable[Path]] = None):
         logging.info("copying files...")
-        for file_ in self.files_to_copy:
+        files = list(self.files_to_copy if files is None else files)
+        if self.minifier is not None:
+            # minify assets across the minifier's process pool, then copy the rest
+            to_minify = [file_ for file_ in files if self.minifier.handles(file_)]
+            output_filenames = [
+                self.output_dir / self.copied_output_name(file_) for file_ in to_minify
+            ]
+            self.minifier.minify_files(
+                zip((self.content_dir / file_ for file_ in to_minify), output_filenames)
+            )
+            for output_filename in output_filenames:
+                self._record_output(output_filename)
+            files = [file_ for file_ in files if not self.minifier.handles(file_)]
+        for file_ in files:
             self.copy_file(file_)
         logging.info("copied files")
 
@@ -277,24 +597,248 @@ class Site:
         logging.info(f"deleting file {filename}")
         output_filename = self.output_dir / filename
         output_filename.unlink()
+        self._record_output(output_filename)
         logging.info(f"deleted file")
 
-    def build(self):
+    def expected_outputs(self) -> Set[str]:
+        """The paths, relative to the output directory, of every file a full build of
+        the site generates."""
+        outputs = {
+            self.page_output_filename(page).relative_to(self.output_dir).as_posix()
+            for page in self.pages.values()
+        }
+        outputs.update(
+            self.copied_output_name(filename).as_posix()
+            for filename in self.files_to_copy
+        )
+        for taxonomy in self.taxonomies.values():
+            if taxonomy.template is not None:
+                outputs.update(
+                    taxonomy.term_page_name(term) + ".html" for term in taxonomy.terms()
+                )
+        for source in self._sass_entry_points():
+            outputs.add(self.asset(self._sass_logical_path(source)).lstrip("/"))
+        if self.fingerprinter is not None:
+            outputs.add(self.fingerprinter.settings.manifest.as_posix())
+        return outputs
+
+    def check_links(self, workers: Optional[int] = None) -> List[BrokenLink]:
+        links_cache = FileCache(self.cache_file("links.json"))
+        broken = LinkChecker(self.output_dir, links_cache).check(
+            self.expected_outputs(), workers
+        )
+        links_cache.save()
+        for broken_link in broken:
+            logging.warning(
+                f"{broken_link.page}: broken link {broken_link.link} "
+                f"({broken_link.reason})"
+            )
+        logging.info(f"found {len(broken)} broken links")
+        return broken
+
+    def delete_copied_file(self, filename: Path):
+        if self.fingerprinter is not None:
+            filename = Path(self.fingerprinter.discard(filename.as_posix()))
+        if not (self.output_dir / filename).is_file():
+            logging.info(f"{filename} was never copied, nothing to delete")
+            return
+        self.delete_file(filename)
+
+    def build(
+        self,
+        pipelined: bool = False,
+        shard: Optional[Shard] = None,
+        prune: bool = True,
+        assets: bool = True,
+    ):
+        """Render the site into the output directory.
+
+        Args:
+            pipelined (`bool`): Overlap reads and writes with rendering.
+            shard (`Shard`, optional): Only build this slice of the site.
+            prune (`bool`): Delete outputs of earlier builds that this one no longer
+                produces. Partial builds, and builds that skip assets, never prune.
+            assets (`bool`): Compile Sass, copy files and write the asset manifest.
+                With a `selector`, `False` makes the build only render pages.
+
+        """
         tic = time.perf_counter()
         if self.fully_initialized:
-            self.render_all_pages()
-            self.compile_sass()
-            self.copy_all_files()
+            page_names = list(self.pages)
+            files = list(self.files_to_copy) if assets else []
+            build_shared = True
+            if shard is not None:
+                logging.info(f"building shard {shard}")
+                page_names = [name for name in page_names if shard.includes(name)]
+                files = [file_ for file_ in files if shard.includes(file_.as_posix())]
+                build_shared = shard.is_primary
+            if self.selector is not None:
+                page_names = [
+                    name for name in page_names if self.is_selected(self.pages[name])
+                ]
+                logging.info(f"building {len(page_names)} of {len(self.pages)} pages")
+            self.pop_written_outputs()
+            self.context_cache.clear()
+
+            if pipelined:
+                BuildPipeline(self, page_names, files, build_shared and assets).run()
+            else:
+                self.render_all_pages(page_names)
+                if build_shared and assets:
+                    self.compile_sass()
+                if assets:
+                    self.copy_all_files(files)
+            if build_shared:
+                self.render_taxonomy_pages()
+                if assets:
+                    self.write_asset_manifest()
+            self.save_caches()
+
+            if shard is not None:
+                write_manifest(
+                    self.output_dir,
+                    shard,
+                    pages=page_names,
+                    files=[file_.as_posix() for file_ in files],
+                    outputs=[
+                        output.relative_to(self.output_dir).as_posix()
+                        for output in self.pop_written_outputs()
+                    ],
+                    digest=site_digest(
+                        self.pages, (file_.as_posix() for file_ in self.files_to_copy)
+                    ),
+                )
+            else:
+                self.record_outputs(prune=prune and self.selector is None and assets)
             toc = time.perf_counter()
-            logging.info(f"done in {tictoc(tic,toc)}s!")
+            peak_rss = peak_rss_mb()
+            if peak_rss is not None:
+                logging.info(f"done in {tictoc(tic,toc)}s! (peak RSS {peak_rss} MB)")
+            else:
+                logging.info(f"done in {tictoc(tic,toc)}s!")
         else:
             raise NotInitializedError(
                 "Site must be fully initialized before building. Run _fully_initialize."
             )
 
+    def build_archive(self, archive_filename: Path):
+        """Build the site straight into a tar or zip archive without touching the
+        output directory. Pages, taxonomy pages, compiled Sass, copied files and the
+        asset manifest are added in that order, each sorted by name, so rebuilding
+        unchanged inputs gives an identical archive. Only one page is held in
+        memory at a time, and copied files are streamed."""
+        tic = time.perf_counter()
+        if not self.fully_initialized:
+            raise NotInitializedError(
+                "Site must be fully initialized before building. Run _fully_initialize."
+            )
+        self.context_cache.clear()
+        with ArchiveWriter(archive_filename) as archive:
+            logging.info(f"archiving to {archive_filename}...")
+            for name in sorted(self.pages):
+                self._archive_page(archive, self.pages[name])
+            for taxonomy in self.taxonomies.values():
+                if taxonomy.template is not None:
+                    terms = taxonomy.terms()
+                    for term in sorted(terms, key=taxonomy.term_page_name):
+                        self._archive_page(archive, taxonomy.term_page(term))
+                    taxonomy.mark_rendered(terms)
+            for source in self._sass_entry_points():
+                css = self._compile_sass_file(source).encode("utf-8")
+                logical_path = self._sass_logical_path(source)
+                if self.fingerprinter is not None and self.fingerprints(logical_path):
+                    logical_path = self.fingerprinter.add(
+                        logical_path, self.fingerprinter.hash_bytes(css)
+                    )
+                self._archive_bytes(archive, logical_path, css)
+            for filename in sorted(self.files_to_copy):
+                name = self.copied_output_name(filename).as_posix()
+                input_filename = self.content_dir / filename
+                if self.minifier is not None and self.minifier.handles(filename):
+                    with open(input_filename, "rb") as f:
+                        self._archive_bytes(archive, name, f.read())
+                else:
+                    archive.add_file(name, input_filename)
+            if self.fingerprinter is not None:
+                archive.add_bytes(
+                    self.fingerprinter.settings.manifest.as_posix(),
+                    self.fingerprinter.manifest_json().encode("utf-8"),
+                )
+            entries = len(archive.names)
+        self.save_caches()
+        toc = time.perf_counter()
+        logging.info(
+            f"archived {entries} files to {archive_filename} in {tictoc(tic,toc)}s!"
+        )
+
+    def _archive_bytes(self, archive: ArchiveWriter, name: str, data: bytes):
+        if self.minifier is not None and self.minifier.handles(Path(name)):
+            data = self.minifier.minify_bytes(Path(name).suffix, data)
+        archive.add_bytes(name, data)
+
+    def _archive_page(self, archive: ArchiveWriter, page: Page):
+        content = self.render_content(page)
+        output = self.render_template(page, content)
+        assert isinstance(output, str)
+        name = self.page_output_filename(page).relative_to(self.output_dir)
+        self._archive_bytes(archive, name.as_posix(), output.encode("utf-8"))
+        if self.low_memory:
+            page.release_content()
+        logging.debug(f"archived {page.name}")
+
     def clean(self):
         logging.info(f"Emptying {self.output_dir}")
         delete_directory_contents(self.output_dir)
 
+    def record_outputs(self, prune: bool = True) -> List[str]:
+        """Record the outputs written since the last call as the output directory's
+        contents. With `prune`, outputs recorded by the previous build that weren't
+        written this time are deleted; otherwise they stay recorded so a later build
+        can prune them.
+
+        Returns:
+            List[str]: The pruned outputs, relative to the output directory.
+
+        """
+        outputs = {
+            output.relative_to(self.output_dir).as_posix()
+            for output in self.pop_written_outputs()
+            if output.is_file()
+        }
+        previous = read_outputs(self.output_dir) or set()
+        pruned = []
+        if prune:
+            pruned = prune_outputs(self.output_dir, previous - outputs)
+            if pruned:
+                logging.info(f"pruned {len(pruned)} stale outputs")
+        else:
+            outputs |= previous
+        write_outputs(self.output_dir, outputs)
+        return pruned
+
+    def prune(self, dry_run: bool = False) -> List[str]:
+        """Delete outputs recorded by earlier builds that the site no longer
+        generates, without building it."""
+        previous = read_outputs(self.output_dir)
+        if previous is None:
+            logging.info(f"no outputs recorded in {self.output_dir}, nothing to prune")
+            return []
+        expected = self.expected_outputs()
+        pruned = prune_outputs(self.output_dir, previous - expected, dry_run)
+        if not dry_run:
+            write_outputs(self.output_dir, previous & expected)
+        logging.info(
+            f"{'would prune' if dry_run else 'pruned'} {len(pruned)} stale outputs"
+        )
+        return pruned
+
+    def _record_output(self, output_filename: Path):
+        self.written_outputs.append(output_filename)
+
+    def pop_written_outputs(self) -> List[Path]:
+        """Return the output files written or deleted since the last call."""
+        written_outputs, self.written_outputs = self.written_outputs, []
+        return written_outputs
+
     def _path_to_name(self, filename: Path) -> str:
         return str(rel_name(filename, rel_path=self.content_dir))
@@ -0,0 +1,120 @@
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from .exceptions import TaxonomyError
+from .models.taxonomy import TaxonomySettings
+from .page import Page
+from .utils import slugify
+
+
+class Taxonomy:
+    def __init__(
+        self,
+        key: str,
+        template: Optional[str] = None,
+        output_path: Optional[Path] = None,
+    ):
+        """An inverted index from the values of one `Page.ctx` key to the pages
+        having them, e.g. from each tag to the pages tagged with it.
+
+        Args:
+            key (`str`): The `ctx` key to index. Pages whose value is a list are
+                indexed under each item.
+            template (`str`, optional): If given, one page per term is rendered with
+                this template, with `page.term` and `page.members` set.
+            output_path (`Path`, optional): Where term pages are written, relative to
+                the output directory. Defaults to `key`.
+
+        """
+        self.key = key
+        self.template = template
+        self.output_path = output_path if output_path is not None else Path(key)
+        self._terms: Dict[Hashable, Dict[str, Page]] = {}
+        # term page name -> term, to catch terms whose pages would collide
+        self._term_page_names: Dict[str, Hashable] = {}
+        self._rendered: Dict[Hashable, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_taxonomy_settings(cls, settings: TaxonomySettings):
+        return cls(**settings.dict())
+
+    def _page_terms(self, page: Page) -> List[Hashable]:
+        value = page.ctx.get(self.key)
+        if value is None:
+            return []
+        terms = value if isinstance(value, list) else [value]
+        return [term for term in terms if isinstance(term, Hashable)]
+
+    def add(self, page: Page):
+        """Index `page` under its terms.
+
+        Raises:
+            TaxonomyError: If the taxonomy renders term pages and one of the page's
+                terms has the same page name as an existing term, e.g. "C++" and
+                "C#".
+
+        """
+        for term in self._page_terms(page):
+            if term not in self._terms and self.template is not None:
+                name = self.term_page_name(term)
+                existing = self._term_page_names.setdefault(name, term)
+                if existing != term:
+                    raise TaxonomyError(
+                        f"{self.key} terms {existing!r} and {term!r} would both be "
+                        f"rendered to {name}.html (in {page.name})"
+                    )
+            self._terms.setdefault(term, {})[page.name] = page
+
+    def remove(self, page: Page):
+        for term in self._page_terms(page):
+            members = self._terms.get(term)
+            if members is not None and members.get(page.name) is page:
+                del members[page.name]
+                if not members:
+                    del self._terms[term]
+                    self._term_page_names.pop(self.term_page_name(term), None)
+
+    def where(self, term: Any) -> List[Page]:
+        """The pages having `term`, sorted by name."""
+        members = self._terms.get(term, {})
+        return [members[name] for name in sorted(members)]
+
+    def terms(self) -> List[Hashable]:
+        return list(self._terms)
+
+    def __contains__(self, term: Any) -> bool:
+        return term in self._terms
+
+    def term_page_name(self, term: Hashable) -> str:
+        return (self.output_path / slugify(str(term))).as_posix()
+
+    def term_page(self, term: Hashable) -> Page:
+        return Page(
+            name=self.term_page_name(term),
+            metadata={
+                "template": self.template,
+                "ctx": {
+                    "taxonomy": self.key,
+                    "term": term,
+                    "members": self.where(term),
+                },
+            },
+        )
+
+    def changed_terms(self) -> Tuple[List[Hashable], List[Hashable]]:
+        """Return the terms whose membership changed since they were last marked
+        rendered, and the previously rendered terms which no longer have pages."""
+        changed = [
+            term
+            for term, members in self._terms.items()
+            if self._rendered.get(term) != frozenset(members)
+        ]
+        removed = [term for term in self._rendered if term not in self._terms]
+        return changed, removed
+
+    def mark_rendered(self, terms: Iterable[Hashable]):
+        for term in terms:
+            if term in self._terms:
+                self._rendered[term] = frozenset(self._terms[term])
+            else:
+                self._rendered.pop(term, None)
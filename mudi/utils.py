@@ -1,5 +1,13 @@
 from pathlib import Path
+import re
 import shutil
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
 
 
 def rel_name(filename: Path, rel_path: Path) -> Path:
@@ -21,3 +29,28 @@ def delete_directory_contents(dir_path: Path):
 
 def tictoc(tic: float, toc: float) -> float:
     return round(toc - tic, 2)
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    divisor = 1024**2 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * resource.getpagesize()
+    except (OSError, AttributeError):
+        # no procfs, so fall back to the peak
+        peak = peak_rss_mb()
+        return int(peak * 1024**2) if peak is not None else None
+
+
+def slugify(text: str) -> str:
+    slug = re.sub(r"[^\w]+", "-", text.lower()).strip("-")
+    return slug or "-"
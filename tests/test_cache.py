@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+from pathlib import Path
+
+from mudi.cache import FileCache
+
+WORKERS = 6
+ROUNDS = 10
+KEYS = 10
+
+
+def _fill(filename: Path, worker: int) -> int:
+    for round_ in range(ROUNDS):
+        cache = FileCache(filename)
+        for key in range(KEYS):
+            cache.set(f"{worker}-{round_}-{key}", key)
+        cache.save()
+    return worker
+
+
+def test_concurrent_saves_keep_every_entry(tmp_path):
+    filename = tmp_path / "highlight.json"
+    with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        futures = [
+            executor.submit(_fill, filename, worker) for worker in range(WORKERS)
+        ]
+        for future in futures:
+            future.result()
+    with open(filename) as f:
+        assert len(json.load(f)) == WORKERS * ROUNDS * KEYS
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_save_merges_and_discards(tmp_path):
+    filename = tmp_path / "cache.json"
+    first = FileCache(filename)
+    second = FileCache(filename)
+    first.set("a", 1)
+    first.set("b", 2)
+    first.save()
+    second.set("c", 3)
+    second.save()
+    assert FileCache(filename).get("a") == 1
+    second.discard("c")
+    second.discard("a")
+    second.save()
+    reloaded = FileCache(filename)
+    assert "a" not in reloaded and "c" not in reloaded
+    assert reloaded.get("b") == 2
@@ -0,0 +1,39 @@
+from mudi.highlight import HighlightCache
+from mudi.markdown import MarkdownRenderer
+from mudi.models import MarkdownSettings
+
+SOURCE = """# Code
+
+```python
+def f(x):
+    return x < 1
+```
+
+    :::python
+    print("a & b")
+
+~~~ {.js hl_lines="1"}
+let a = 1;
+~~~
+"""
+
+
+def test_cached_highlighting_matches_uncached():
+    settings = MarkdownSettings(enable_codehilite=True)
+    expected = MarkdownRenderer(settings).convert(SOURCE)
+    cache = HighlightCache()
+    assert MarkdownRenderer(settings, cache).convert(SOURCE) == expected
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert MarkdownRenderer(settings, cache).convert(SOURCE) == expected
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_cache_is_keyed_on_highlighting_options():
+    cache = HighlightCache()
+    MarkdownRenderer(MarkdownSettings(enable_codehilite=True), cache).convert(SOURCE)
+    settings = MarkdownSettings(
+        enable_codehilite=True, codehilite_options={"css_class": "other"}
+    )
+    html = MarkdownRenderer(settings, cache).convert(SOURCE)
+    assert 'class="other"' in html and 'class="highlight"' not in html
+    assert cache.hits == 0
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+from mudi.minify import MINIFY_VERSION, Minifier, minify_css, minify_html, prune_cache
+from mudi.models import MinifySettings
+
+
+def test_html_collapses_whitespace_between_tags():
+    assert minify_html("<p>\n  a   <b>b</b>\n\n  c\n</p>\n") == "<p> a <b>b</b> c </p>"
+
+
+def test_html_keeps_attribute_values():
+    html = "<p title=\"a   b\" data-x='c\n  d'>x</p>"
+    assert minify_html(html) == html
+
+
+def test_html_keeps_quoted_angle_brackets_in_attributes():
+    html = '<a title="1 > 0   ok" href="/">  link  </a>'
+    assert minify_html(html) == '<a title="1 > 0   ok" href="/"> link </a>'
+
+
+def test_html_preserves_whitespace_sensitive_elements():
+    html = "<pre>a\n\n  b</pre>\n<textarea>x  y</textarea>\n<script>let s = `1\n\n3`;</script>"
+    assert minify_html(html) == (
+        "<pre>a\n\n  b</pre> <textarea>x  y</textarea> <script>let s = `1\n\n3`;</script>"
+    )
+
+
+def test_html_preserved_elements_need_an_exact_tag_name():
+    assert minify_html("<pre-x>a\n\n  b</pre-x>") == "<pre-x>a b</pre-x>"
+    assert minify_html('<pre class="x">a  b</pre>') == '<pre class="x">a  b</pre>'
+
+
+def test_html_strips_comments_but_keeps_conditional_comments():
+    html = "<p>a<!-- note > here -->b</p><!--[if IE]><p>ie</p><![endif]-->"
+    assert minify_html(html) == "<p>ab</p><!--[if IE]><p>ie</p><![endif]-->"
+
+
+def test_css_strips_comments_and_whitespace():
+    css = "/* c */\nbody {\n  color: red;\n  margin: 0 auto;\n}\n"
+    assert minify_css(css) == "body{color:red;margin:0 auto}"
+
+
+def test_css_keeps_descendant_pseudo_class_selectors():
+    assert minify_css("a :hover { color: red }") == "a :hover{color:red}"
+
+
+def test_css_keeps_strings_and_licence_comments():
+    css = '/*! licence */ a::before { content: "a  /* b */  c" ; }'
+    assert minify_css(css) == '/*! licence */ a::before{content:"a  /* b */  c"}'
+
+
+def test_javascript_is_not_minified():
+    minifier = Minifier(MinifySettings())
+    assert not minifier.handles(Path("app.js"))
+    assert minifier.handles(Path("index.html"))
+    assert minifier.handles(Path("main.css"))
+
+
+def test_only_css_is_cached(tmp_path):
+    minifier = Minifier(MinifySettings(), tmp_path)
+    minifier.minify_html("<p>\n  a\n</p>")
+    assert not list(tmp_path.iterdir())
+    minifier.minify_bytes(".css", b"a { color: red; }")
+    minifier.minify_bytes(".css", b"a { color: red; }")
+    assert len(list(tmp_path.iterdir())) == 1
+    assert minifier.cached == 1
+
+
+def test_prune_cache_evicts_least_recently_used_and_stale_entries(tmp_path):
+    for index in range(4):
+        entry = tmp_path / f"{MINIFY_VERSION}-css-{index}"
+        entry.write_bytes(b"")
+        os.utime(str(entry), (index, index))
+    (tmp_path / f"{MINIFY_VERSION}-html-0").write_bytes(b"")
+    (tmp_path / "0-css-0").write_bytes(b"")
+    assert prune_cache(tmp_path, max_entries=2) == 4
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+        f"{MINIFY_VERSION}-css-2",
+        f"{MINIFY_VERSION}-css-3",
+    ]
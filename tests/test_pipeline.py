@@ -0,0 +1,72 @@
+import gc
+from pathlib import Path
+import sys
+
+from jinja2 import UndefinedError
+import pytest
+
+from mudi.site import Site
+
+POSTS = 21
+
+
+def _write_site(root: Path):
+    (root / "settings.toml").write_text(
+        '[collections.blog]\nname = "blog"\n\n[ctx]\ntitle = "Test"\n'
+    )
+    templates = root / "src" / "templates"
+    templates.mkdir(parents=True)
+    (templates / "default.html").write_text(
+        "<h1>{{ site.title }}</h1>"
+        "{% for p in collections.blog %}<div>{{ p.content }}</div>{% endfor %}"
+        "{{ content }}"
+    )
+    content = root / "src" / "content"
+    for i in range(POSTS):
+        post = content / "blog" / f"post{i}.md"
+        post.parent.mkdir(parents=True, exist_ok=True)
+        post.write_text(f"---\ncollections: [blog]\n---\n# Post {i}\n\nBody {i}.\n")
+    (content / "index.md").write_text("# Home\n")
+
+
+def _build(root: Path, output_dir: str, **kwargs) -> dict:
+    pipelined = kwargs.pop("pipelined", False)
+    site = Site.from_settings_file(root / "settings.toml", Path(output_dir), **kwargs)
+    site.build(pipelined=pipelined)
+    return {
+        path.relative_to(output_dir).as_posix(): path.read_bytes()
+        for path in Path(output_dir).glob("**/*.html")
+    }
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch) -> Path:
+    _write_site(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_pipelined_build_matches_serial_build(site):
+    serial = _build(site, "serial")
+    assert len(serial) == POSTS + 1
+    assert b"Body 20.</div>" in serial["blog/post0.html"]
+    assert _build(site, "piped", pipelined=True, lazy_content=True) == serial
+
+
+
+def test_low_memory_build_reads_released_bodies_again(site):
+    serial = _build(site, "serial")
+    assert _build(site, "low_memory", low_memory=True) == serial
+
+
+def test_failed_stage_stops_the_pipeline(site, monkeypatch):
+    unraisable: list = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append, raising=False)
+    (site / "src" / "content" / "blog" / "post3.md").write_text(
+        "---\ncollections: [blog]\nhas_jinja: true\n---\n{{ missing() }}\n"
+    )
+    with pytest.raises(UndefinedError):
+        _build(site, "piped", pipelined=True, lazy_content=True)
+    # stages left waiting on their queues are only reported once collected
+    gc.collect()
+    assert not unraisable
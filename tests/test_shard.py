@@ -0,0 +1,114 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import mudi
+from mudi.exceptions import ShardMergeError
+from mudi.shard import MANIFEST_NAME, merge_shards
+
+SHARDS = 3
+# bookkeeping files that differ between a merged and a serial build by design
+BOOKKEEPING = {MANIFEST_NAME, ".mudi_outputs.json"}
+
+
+def _write_site(root: Path):
+    (root / "settings.toml").write_text(
+        '[sass]\n\n[collections.blog]\nname = "blog"\n\n[ctx]\ntitle = "Test"\n'
+    )
+    templates = root / "src" / "templates"
+    templates.mkdir(parents=True)
+    (templates / "default.html").write_text(
+        "<h1>{{ site.title }}</h1>"
+        "{% for p in collections.blog %}<a href='/{{ p.name }}.html'></a>{% endfor %}"
+        "{{ content }}"
+    )
+    content = root / "src" / "content"
+    for i in range(12):
+        post = content / "blog" / f"post{i}.md"
+        post.parent.mkdir(parents=True, exist_ok=True)
+        post.write_text(f"---\ncollections: [blog]\n---\n# Post {i}\n")
+        static = content / "static" / f"file{i}.txt"
+        static.parent.mkdir(parents=True, exist_ok=True)
+        static.write_text(f"file {i}\n")
+    (content / "index.md").write_text("# Home\n")
+    sass = root / "src" / "sass"
+    sass.mkdir()
+    (sass / "main.scss").write_text("$c: red;\nbody { color: $c; }\n")
+
+
+def _mudi(*args: str) -> list:
+    return [sys.executable, "-c", "from mudi.cli import cli; cli()", *args]
+
+
+def _contents(directory: Path) -> dict:
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in directory.glob("**/*")
+        if path.is_file() and path.name not in BOOKKEEPING
+    }
+
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("site")
+    _write_site(root)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(mudi.__file__).parent.parent), env.get("PYTHONPATH", "")]
+    )
+    subprocess.run(_mudi("build", "-o", "serial"), cwd=root, env=env, check=True)
+    shards = [
+        subprocess.Popen(
+            _mudi("build", "--shard", f"{i}/{SHARDS}", "-o", f"shard{i}"),
+            cwd=root,
+            env=env,
+        )
+        for i in range(1, SHARDS + 1)
+    ]
+    assert all(shard.wait() == 0 for shard in shards)
+    return root
+
+
+def _shard_dirs(site: Path) -> list:
+    return [site / f"shard{i}" for i in range(1, SHARDS + 1)]
+
+
+def test_merged_shards_match_serial_build(site, tmp_path):
+    merge_shards(_shard_dirs(site), tmp_path / "merged")
+    merged = _contents(tmp_path / "merged")
+    assert merged == _contents(site / "serial")
+    assert "blog/post0.html" in merged and "css/main.css" in merged
+
+
+def test_every_shard_has_work(site):
+    for shard_dir in _shard_dirs(site):
+        with open(shard_dir / MANIFEST_NAME) as f:
+            assert json.load(f)["pages"]
+
+
+def test_missing_shard(site, tmp_path):
+    with pytest.raises(ShardMergeError, match="missing shards"):
+        merge_shards(_shard_dirs(site)[:2], tmp_path / "merged")
+
+
+def test_duplicate_shard(site, tmp_path):
+    shard_dirs = _shard_dirs(site)
+    with pytest.raises(ShardMergeError, match="given twice"):
+        merge_shards(shard_dirs + shard_dirs[:1], tmp_path / "merged")
+
+
+def test_mismatched_digest(site, tmp_path):
+    shard_dirs = _shard_dirs(site)
+    altered = tmp_path / "altered"
+    shutil.copytree(str(shard_dirs[1]), str(altered))
+    manifest_filename = altered / MANIFEST_NAME
+    manifest = json.loads(manifest_filename.read_text())
+    manifest["site_digest"] = "0" * 40
+    manifest_filename.write_text(json.dumps(manifest))
+    with pytest.raises(ShardMergeError, match="different site"):
+        merge_shards([shard_dirs[0], altered, shard_dirs[2]], tmp_path / "merged")